@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+#
+# Measure the cold start time of the 360 Monitoring CLI with "python -X importtime" and keep track of it over releases.
+#
+# Usage: python benchmarks/startup.py [--runs 10] [--budget-ms 50] [--history benchmarks/startup-history.csv]
+#
+# The script exits with status 1 if the median import time of cli360monitoring.monitoring exceeds the budget.
+
+import os
+import re
+import sys
+import csv
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+here = os.path.abspath(os.path.dirname(__file__))
+root = os.path.dirname(here)
+
+def cliVersion():
+    """Read the CLI version from monitoring.py without importing it"""
+    with open(os.path.join(root, 'cli360monitoring', 'monitoring.py')) as file:
+        match = re.search(r"__version__ = '([^']+)'", file.read())
+        return match.group(1) if match else ''
+
+def importTimes():
+    """Import the CLI in a fresh interpreter and return cumulative import time in microseconds per module"""
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import cli360monitoring.monitoring'], env=env, capture_output=True, text=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # format: "import time: self [us] | cumulative | imported package"
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)', line)
+        if match:
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+def commandTime(command):
+    """Return wall clock time in milliseconds to run the CLI with the specified arguments"""
+    env = dict(os.environ, PYTHONPATH=root)
+    start = datetime.now()
+    subprocess.run([sys.executable, '-m', 'cli360monitoring.monitoring'] + command, env=env, capture_output=True)
+    return (datetime.now() - start).total_seconds() * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup benchmark for 360 Monitoring CLI')
+    parser.add_argument('--runs', type=int, default=10, help='number of measurements to take the median of')
+    parser.add_argument('--budget-ms', type=float, default=50, help='max. median import time of the CLI in milliseconds')
+    parser.add_argument('--history', default=os.path.join(here, 'startup-history.csv'), help='CSV file to append the results to')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest imports to print')
+    args = parser.parse_args()
+
+    # first run compiles the byte code and is not taken into account
+    importTimes()
+
+    runs = [importTimes() for _ in range(args.runs)]
+    import_ms = statistics.median(run['cli360monitoring.monitoring'] for run in runs) / 1000
+    help_ms = statistics.median(commandTime(['--help']) for _ in range(args.runs))
+
+    print('CLI version:'.ljust(30), cliVersion())
+    print('Python version:'.ljust(30), sys.version.split()[0])
+    print('import time (median):'.ljust(30), '{:.1f} ms'.format(import_ms))
+    print('360monitoring --help (median):'.ljust(30), '{:.1f} ms'.format(help_ms))
+    print()
+    print('Slowest imports (cumulative):')
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for module, us in slowest:
+        print('  {:>8.1f} ms  {}'.format(us / 1000, module))
+
+    if args.history:
+        exists = os.path.isfile(args.history)
+        with open(args.history, 'a', newline='') as file:
+            writer = csv.writer(file)
+            if not exists:
+                writer.writerow(['date', 'version', 'python', 'import_ms', 'help_ms'])
+            writer.writerow([datetime.now().isoformat(timespec='seconds'), cliVersion(), sys.version.split()[0], '{:.1f}'.format(import_ms), '{:.1f}'.format(help_ms)])
+
+    if import_ms > args.budget_ms:
+        print()
+        print('Import time of {:.1f} ms exceeds budget of {:.1f} ms'.format(import_ms, args.budget_ms))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
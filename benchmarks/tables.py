@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Compare rendering the "servers list" table the way it was done before (render with footer, delete footer,
+# render as CSV to resolve the sort column, render again sorted) with rendering it once via SortableTable.
+#
+# Usage: python benchmarks/tables.py [--servers 5000] [--runs 3] [--sort 6] [--limit 0]
+
+import io
+import os
+import sys
+import random
+import argparse
+import contextlib
+from timeit import default_timer as timer
+
+here = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+from prettytable import PrettyTable
+
+from cli360monitoring.lib.config import Config
+from cli360monitoring.lib.servers import Servers
+from cli360monitoring.lib.records import ServerRecord
+
+def createServers(count: int):
+    """Create fake servers with the fields used by the servers list command"""
+    random.seed(1)
+    servers = []
+    for i in range(count):
+        servers.append({
+            'id': '%024x' % i,
+            'name': 'server%d.example.com' % i,
+            'os': 'Ubuntu 22.04',
+            'status': 'active',
+            'tags': ['production', 'cpanel'] if i % 2 else ['staging'],
+            'ip_whois': {'ip': '10.0.%d.%d' % (i // 256 % 256, i % 256), 'country': 'DE', 'org': 'Hoster'},
+            'summary': {'cpu_usage_percent': round(random.random() * 100, 1), 'mem_usage_percent': round(random.random() * 100, 1), 'disk_usage_percent': round(random.random() * 100, 1)},
+            'last_data': {'cores': 4, 'memory': {'total': 8388608, 'used': 1, 'free': 1, 'available': 1},
+                          'df': [{'mount': '/', 'free_bytes': random.randint(1, 100), 'used_bytes': 100}, {'mount': '/var', 'free_bytes': random.randint(1, 100), 'used_bytes': 100}]},
+        })
+    return servers
+
+def renderTwice(table: PrettyTable, footer, sort: str, reverse: bool, limit: int):
+    """Previous implementation of printFooter"""
+    table.add_row(footer)
+    list_of_table_lines = table.get_string().split('\n')
+    summary_line = list_of_table_lines[-2]
+    table.del_row(len(table.rows)-1)
+
+    if sort:
+        if sort.isdecimal():
+            sort = table.get_csv_string().split(',')[int(sort) - 1]
+    else:
+        sort = None
+
+    if limit > 0:
+        list_of_table_lines = table.get_string(sortby=sort, reversesort=reverse, start=0, end=limit).split('\n')
+    else:
+        list_of_table_lines = table.get_string(sortby=sort, reversesort=reverse).split('\n')
+
+    return '\n'.join(list_of_table_lines + [summary_line, list_of_table_lines[0]])
+
+def main():
+    parser = argparse.ArgumentParser(description='Table rendering benchmark for 360 Monitoring CLI')
+    parser.add_argument('--servers', type=int, default=5000, help='number of servers in the table')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs to take the best time of')
+    parser.add_argument('--sort', default='6', help='column to sort by')
+    parser.add_argument('--limit', type=int, default=0, help='number of rows to print')
+    args = parser.parse_args()
+
+    config = Config('benchmark')
+    data = [ServerRecord(server) for server in createServers(args.servers)]
+
+    old_times = []
+    new_times = []
+    for _ in range(args.runs):
+        servers = Servers(config)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for server in data:
+                servers.print(server)
+
+        # rows are formatted in both cases, only rendering of the table is measured
+        table = PrettyTable(field_names=servers.table.field_names)
+        for values, cells in servers.table.rows:
+            table.add_row(cells)
+        footer = [''] * len(table.field_names)
+
+        start = timer()
+        renderTwice(table, footer, args.sort, True, args.limit)
+        old_times.append(timer() - start)
+
+        start = timer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            servers.printFooter(sort=args.sort, reverse=True, limit=args.limit)
+        new_times.append(timer() - start)
+
+    print('servers:'.ljust(30), args.servers)
+    print('render twice (before):'.ljust(30), '{:.3f} s'.format(min(old_times)))
+    print('render once (SortableTable):'.ljust(30), '{:.3f} s'.format(min(new_times)))
+    print('speedup:'.ljust(30), '{:.1f}x'.format(min(old_times) / min(new_times)))
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,47 @@
 #!/usr/bin/env python3
 
 import json
+import time
+import random
+import threading
 import requests
 from http import HTTPStatus
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 
+from .cache import responseCache
 from .config import Config
 from .functions import printError
+from .jsonstream import iterArrayItems
+
+# HTTP session shared by all API calls of this process to reuse (keep-alive) connections
+_session = None
+_session_lock = threading.Lock()
+
+# time spent per endpoint for --timings
+_timings = {}
+_timings_lock = threading.Lock()
+
+# rate limiter shared by all API calls of this process
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+# retries shared by all API calls of this process
+_retry_budget = None
+_retry_budget_lock = threading.Lock()
+
+# writes of bulk operations in progress only mark the cached responses as outdated, they are invalidated once the operations are finished
+_bulk_writes = 0
+_cache_outdated = False
+_bulk_writes_lock = threading.Lock()
+
+# status codes of temporary errors to retry. POST is not idempotent and only retried if the request was rejected before being processed
+RETRY_STATUS_CODES = (HTTPStatus.TOO_MANY_REQUESTS.value, HTTPStatus.BAD_GATEWAY.value, HTTPStatus.SERVICE_UNAVAILABLE.value, HTTPStatus.GATEWAY_TIMEOUT.value)
+RETRY_STATUS_CODES_POST = (HTTPStatus.TOO_MANY_REQUESTS.value, HTTPStatus.SERVICE_UNAVAILABLE.value)
+
+# max. seconds to wait before a retry, also if the API asks for more via Retry-After
+MAX_RETRY_DELAY = 60
 
 def toParamString(params):
     s = '?'
@@ -14,8 +50,297 @@ def toParamString(params):
 
     return s.rstrip('&')
 
-def apiGet(path: str, config: Config, expectedStatusCode: HTTPStatus = HTTPStatus.OK, params: dict = None):
-    """Do a GET request and return JSON from response if expected status code was returned"""
+def apiSession(config: Config):
+    """Return the HTTP session shared by all API calls, create it with a connection pool configured in config file on first use"""
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            # pool_connections is the number of hosts to keep pools for, pool_maxsize the max number of connections per host
+            adapter = HTTPAdapter(pool_connections=int(config.pool_connections), pool_maxsize=int(config.pool_maxsize), pool_block=True)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+            if not config.keep_alive:
+                session.headers['Connection'] = 'close'
+
+            _session = session
+
+    return _session
+
+def apiConnectionStats():
+    """Return number of new and reused connections of the shared HTTP session"""
+    new_connections = 0
+    num_requests = 0
+
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                new_connections += pool.num_connections
+                num_requests += pool.num_requests
+
+    return new_connections, num_requests - new_connections
+
+def printConnectionStats():
+    """Print how many connections have been opened or reused by the shared HTTP session"""
+    new_connections, reused_connections = apiConnectionStats()
+    print('Connections:', new_connections, 'new,', reused_connections, 'reused')
+
+class RateLimiter(object):
+    """Token bucket that limits all API calls of this process to rate requests per second with bursts of up to burst requests.
+    Each caller reserves a token and waits until it is available, so threads and async tasks are served in the order they arrive"""
+
+    def __init__(self, rate: float, burst: int):
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.waits = 0
+        self.waited = 0.0
+
+    def reserve(self):
+        """Take a token and return seconds to wait until it may be used"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            # a negative number of tokens are the requests already waiting
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            if delay > 0:
+                self.waits += 1
+                self.waited += delay
+            return delay
+
+    def acquire(self):
+        """Wait until the next request may be sent and return the seconds waited"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquireAsync(self):
+        """Wait without blocking the event loop until the next request may be sent and return the seconds waited"""
+        import asyncio
+
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+def rateLimiter(config: Config):
+    """Return the rate limiter shared by all API calls or None if no rate limit is configured"""
+    global _rate_limiter
+
+    if float(config.rate_limit) <= 0:
+        return None
+
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(float(config.rate_limit), int(config.rate_burst))
+
+    return _rate_limiter
+
+def printRateLimiterStats():
+    """Print how often and how long API calls waited for the rate limiter if it was used"""
+    if _rate_limiter is not None:
+        print('Rate limiter:', _rate_limiter.waits, 'waits,', '{:.3f}'.format(_rate_limiter.waited), 'sec')
+
+class RetryBudget(object):
+    """Number of retries left for all API calls of this process. Shared by all worker threads, so that bulk operations
+    give up instead of retrying each request over and over, and all threads pause while the API is rate limiting"""
+
+    def __init__(self, retries: int):
+        self.lock = threading.Lock()
+        self.retries = retries
+        self.paused_until = 0.0
+
+    def take(self):
+        """Return True if a retry is left and use it"""
+        with self.lock:
+            if self.retries <= 0:
+                return False
+            self.retries -= 1
+            return True
+
+    def pause(self, seconds: float):
+        """Let all threads wait the specified number of seconds before sending their next request"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def remaining(self):
+        """Return seconds until a pause requested by the API is over"""
+        with self.lock:
+            return max(0.0, self.paused_until - time.monotonic())
+
+    def wait(self):
+        """Wait until a pause requested by the API is over"""
+        delay = self.remaining()
+        if delay > 0:
+            time.sleep(delay)
+
+def retryBudget(config: Config):
+    """Return the retry budget shared by all API calls"""
+    global _retry_budget
+
+    with _retry_budget_lock:
+        if _retry_budget is None:
+            _retry_budget = RetryBudget(int(config.retry_budget))
+
+    return _retry_budget
+
+def retryDelay(response, attempt: int, backoff: float):
+    """Return seconds to wait before the next attempt: as requested by the Retry-After header, otherwise exponential backoff with jitter"""
+
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        except ValueError:
+            pass
+        try:
+            return min(max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()), MAX_RETRY_DELAY)
+        except (TypeError, ValueError):
+            pass
+
+    delay = min(backoff * (2 ** attempt), MAX_RETRY_DELAY)
+    return random.uniform(delay / 2, delay)
+
+def nextRetry(method: str, path: str, config: Config, attempt: int, response, error):
+    """Return seconds to wait before the request is retried or None if the response is final or no retry is left.
+    A rate limited request lets all threads of this process pause for this time"""
+
+    retry_status_codes = RETRY_STATUS_CODES_POST if method == 'POST' else RETRY_STATUS_CODES
+    if response is not None and response.status_code not in retry_status_codes:
+        return None
+
+    budget = retryBudget(config)
+    if attempt >= int(config.retries) or not budget.take():
+        return None
+
+    delay = retryDelay(response, attempt, float(config.retry_backoff))
+    if config.debug:
+        print('Retrying', method, config.endpoint + path, 'in', '{:.1f}'.format(delay), 'sec', '(' + (str(error) if error else 'status ' + str(response.status_code)) + ')')
+
+    if response is not None and response.status_code == HTTPStatus.TOO_MANY_REQUESTS.value:
+        # rate limits apply to all requests, so all threads slow down
+        budget.pause(delay)
+
+    return delay
+
+def apiRequest(method: str, path: str, config: Config, params: dict = None, data: str = None, stream: bool = False):
+    """Send a request via the shared HTTP session and return the response. Temporary errors are retried with exponential backoff
+    as long as the shared retry budget allows. Raises requests.exceptions.RequestException if the API could not be reached.
+    With stream=True only the headers are received, the body has to be read from the response which must be closed afterwards"""
+
+    budget = retryBudget(config)
+    limiter = rateLimiter(config)
+    attempt = 0
+
+    while True:
+        budget.wait()
+        if limiter:
+            limiter.acquire()
+
+        response = None
+        error = None
+        start = time.perf_counter()
+        try:
+            response = apiSession(config).request(method, config.endpoint + path, params=params, data=data, headers=config.headers(), timeout=float(config.timeout), stream=stream)
+        except requests.exceptions.RequestException as e:
+            # the request might have been processed already if the connection broke afterwards, so POST is never retried then
+            if method == 'POST':
+                raise
+            error = e
+        finally:
+            addTiming(method + ' ' + path, time.perf_counter() - start)
+
+        delay = nextRetry(method, path, config, attempt, response, error)
+        if delay is None:
+            if error:
+                raise error
+            return response
+
+        if response is not None:
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+def addTiming(name: str, seconds: float):
+    """Add the duration of a request to the timings of the specified endpoint"""
+    with _timings_lock:
+        count, total = _timings.get(name, (0, 0.0))
+        _timings[name] = (count + 1, total + seconds)
+
+def printTimings():
+    """Print number of requests and time spent per endpoint"""
+    from prettytable import PrettyTable
+
+    table = PrettyTable(field_names=['Endpoint', 'Requests', 'Total sec', 'Avg sec'])
+    table.align['Endpoint'] = 'l'
+    table.align['Requests'] = 'r'
+    table.align['Total sec'] = 'r'
+    table.align['Avg sec'] = 'r'
+
+    with _timings_lock:
+        timings = sorted(_timings.items())
+
+    for name, (count, total) in timings:
+        table.add_row([name, count, "{:.3f}".format(total), "{:.3f}".format(total / count)])
+
+    # time spent waiting for the rate limiter is not part of the request times above
+    if _rate_limiter is not None and _rate_limiter.waits > 0:
+        table.add_row(['(rate limiter wait)', _rate_limiter.waits, "{:.3f}".format(_rate_limiter.waited), "{:.3f}".format(_rate_limiter.waited / _rate_limiter.waits)])
+
+    print(table)
+
+def apiInvalidateCache(config: Config):
+    """Remove all cached and shared responses after data has been changed"""
+    from .repository import invalidateRepository
+
+    invalidateRepository()
+    cache = responseCache(config)
+    if cache:
+        cache.clear()
+
+def apiDataChanged(config: Config):
+    """Invalidate cached and shared responses after data has been changed. While bulk writes are in progress they are only marked as outdated"""
+    global _cache_outdated
+
+    with _bulk_writes_lock:
+        if _bulk_writes > 0:
+            _cache_outdated = True
+            return
+
+    apiInvalidateCache(config)
+
+@contextmanager
+def bulkWrites(config: Config):
+    """Defer invalidating cached responses until all writes within this context are done, e.g. instead of once per site added or removed in parallel"""
+    global _bulk_writes, _cache_outdated
+
+    with _bulk_writes_lock:
+        _bulk_writes += 1
+
+    try:
+        yield
+    finally:
+        with _bulk_writes_lock:
+            _bulk_writes -= 1
+            invalidate = _bulk_writes == 0 and _cache_outdated
+            if invalidate:
+                _cache_outdated = False
+
+        if invalidate:
+            apiInvalidateCache(config)
+
+def apiGet(path: str, config: Config, expectedStatusCode: HTTPStatus = HTTPStatus.OK, params: dict = None, cacheable: bool = False):
+    """Do a GET request and return JSON from response if expected status code was returned. Cacheable responses are read from and stored in the response cache if enabled"""
     # check if headers are correctly set for authorization
     if not config.headers():
         return None
@@ -23,25 +348,73 @@ def apiGet(path: str, config: Config, expectedStatusCode: HTTPStatus = HTTPStatu
     if not params:
         params = config.params()
 
+    cache = responseCache(config) if cacheable else None
+    if cache:
+        response_json = cache.get(path, params)
+        if response_json is not None:
+            if config.debug:
+                print('GET ' + config.endpoint + path + toParamString(params) + ' (cached)')
+            return response_json
+
     if config.debug:
-        print('GET', config.endpoint + path + toParamString(params))
+        print('GET ' + config.endpoint + path + toParamString(params))
 
     # Make request to API endpoint
-    response = requests.get(config.endpoint + path, params=params, headers=config.headers())
+    try:
+        response = apiRequest('GET', path, config, params=params)
+    except requests.exceptions.RequestException as e:
+        printError('An error occurred:', e)
+        return None
 
     # Check status code of response
     if response.status_code == expectedStatusCode.value:
         # Return json from response
-        return response.json()
+        response_json = response.json()
+        if cache:
+            cache.set(path, params, response_json)
+        return response_json
     else:
         printError('An error occurred:', response.status_code)
         return None
 
-def apiPost(path: str, config: Config, params: dict = None, data: dict = None, expectedStatusCode: HTTPStatus = HTTPStatus.OK, successMessage: str = '', errorMessage: str = ''):
-    """Do a POST request"""
+def apiGetStream(path: str, config: Config, key: str, expectedStatusCode: HTTPStatus = HTTPStatus.OK, params: dict = None):
+    """Do a GET request and yield the items of the array with the specified key of the JSON response while it is being received,
+    so that large responses are never completely kept in memory"""
     # check if headers are correctly set for authorization
     if not config.headers():
-        return False
+        return
+
+    if not params:
+        params = config.params()
+
+    if config.debug:
+        print('GET ' + config.endpoint + path + toParamString(params) + ' (stream)')
+
+    # Make request to API endpoint
+    try:
+        response = apiRequest('GET', path, config, params=params, stream=True)
+    except requests.exceptions.RequestException as e:
+        printError('An error occurred:', e)
+        return
+
+    try:
+        # Check status code of response
+        if response.status_code != expectedStatusCode.value:
+            printError('An error occurred:', response.status_code)
+            return
+
+        yield from iterArrayItems(response.iter_content(chunk_size=65536), key)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        printError('An error occurred:', e)
+    finally:
+        response.close()
+
+def apiSend(method: str, path: str, config: Config, params: dict = None, data: dict = None):
+    """Do a POST, PUT or DELETE request and return the response. Returns None if nothing was sent because of a missing API key or readonly mode.
+    Raises requests.exceptions.RequestException if the API could not be reached"""
+    # check if headers are correctly set for authorization
+    if not config.headers():
+        return None
 
     if not params:
         params = config.params()
@@ -49,13 +422,32 @@ def apiPost(path: str, config: Config, params: dict = None, data: dict = None, e
     dataStr = json.dumps(data) if data else ''
 
     if config.debug:
-        print('POST', config.endpoint + path + toParamString(params), dataStr)
+        # print only the parts that are set
+        print(' '.join(filter(None, [method, config.endpoint + path + toParamString(params), dataStr])))
 
     if config.readonly:
-        return False
+        return None
 
     # Make request to API endpoint
-    response = requests.post(config.endpoint + path, data=dataStr, headers=config.headers())
+    response = apiRequest(method, path, config, data=dataStr if method != 'DELETE' else None)
+
+    # cached collections are outdated as soon as anything has been changed
+    if response.ok:
+        apiDataChanged(config)
+
+    return response
+
+def apiPost(path: str, config: Config, params: dict = None, data: dict = None, expectedStatusCode: HTTPStatus = HTTPStatus.OK, successMessage: str = '', errorMessage: str = ''):
+    """Do a POST request"""
+    try:
+        response = apiSend('POST', path, config, params=params, data=data)
+    except requests.exceptions.RequestException as e:
+        if errorMessage:
+            print(errorMessage, '(' + str(e) + ')')
+        return False
+
+    if response is None:
+        return False
 
     # Check status code of response
     if response.status_code == expectedStatusCode.value:
@@ -85,29 +477,25 @@ def apiPostJSON(path: str, config: Config, params: dict = None, data: dict = Non
         return None
 
     # Make request to API endpoint
-    response = requests.post(config.endpoint + path, data=dataStr, headers=config.headers())
+    try:
+        response = apiRequest('POST', path, config, data=dataStr)
+    except requests.exceptions.RequestException as e:
+        printError('An error occurred:', e)
+        return None
     return response.json()
 
 def apiPut(path: str, config: Config, params: dict = None, data: dict = None, expectedStatusCode: HTTPStatus = HTTPStatus.OK, successMessage: str = '', errorMessage: str = ''):
     """Do a PUT request"""
-    # check if headers are correctly set for authorization
-    if not config.headers():
+    try:
+        response = apiSend('PUT', path, config, params=params, data=data)
+    except requests.exceptions.RequestException as e:
+        if errorMessage:
+            print(errorMessage, '(' + str(e) + ')')
         return False
 
-    if not params:
-        params = config.params()
-
-    dataStr = json.dumps(data) if data else ''
-
-    if config.debug:
-        print('PUT', config.endpoint + path + toParamString(params), dataStr)
-
-    if config.readonly:
+    if response is None:
         return False
 
-    # Make request to API endpoint
-    response = requests.put(config.endpoint + path, data=dataStr, headers=config.headers())
-
     # Check status code of response
     if response.status_code == expectedStatusCode.value:
         if successMessage:
@@ -120,22 +508,16 @@ def apiPut(path: str, config: Config, params: dict = None, data: dict = None, ex
 
 def apiDelete(path: str, config: Config, params: dict = None, expectedStatusCode: HTTPStatus = HTTPStatus.NO_CONTENT, successMessage: str = '', errorMessage: str = ''):
     """Do a DELETE request"""
-    # check if headers are correctly set for authorization
-    if not config.headers():
+    try:
+        response = apiSend('DELETE', path, config, params=params)
+    except requests.exceptions.RequestException as e:
+        if errorMessage:
+            print(errorMessage, '(' + str(e) + ')')
         return False
 
-    if not params:
-        params = config.params()
-
-    if config.debug:
-        print('DELETE', config.endpoint + path + toParamString(params))
-
-    if config.readonly:
+    if response is None:
         return False
 
-    # Make request to API endpoint
-    response = requests.delete(config.endpoint + path, headers=config.headers())
-
     # Check status code of response
     if response.status_code == expectedStatusCode.value:
         if successMessage:
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import asyncio
+import functools
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from .api import apiRequest, apiDataChanged, addTiming, nextRetry, rateLimiter, retryBudget, toParamString
+from .config import Config
+
+# aiohttp is optional (pip install 360monitoringcli[async]), without it requests are sent by a thread pool via the shared HTTP session
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# exceptions raised if the API could not be reached
+REQUEST_ERRORS = (requests.exceptions.RequestException, aiohttp.ClientError, asyncio.TimeoutError) if aiohttp else (requests.exceptions.RequestException,)
+
+# aiohttp sessions per event loop
+_sessions = {}
+
+class AsyncResponse(object):
+    """Response received via aiohttp, with the attributes of a requests response used by the CLI"""
+
+    __slots__ = ('status_code', 'headers', 'text')
+
+    def __init__(self, status_code: int, headers, text: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+def asyncSession(config: Config):
+    """Return the aiohttp session of the running event loop, create it on first use"""
+
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        # the number of requests in flight is limited by the caller, e.g. runAsync()
+        connector = aiohttp.TCPConnector(limit=0, force_close=not config.keep_alive)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+
+    return session
+
+async def closeAsyncSession():
+    """Close the aiohttp session of the running event loop if there is one"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+async def apiRequestAsync(method: str, path: str, config: Config, params: dict = None, data: str = None):
+    """Send a request without blocking the event loop and return the response. Retries, retry budget and rate limit are the same as for apiRequest"""
+
+    if aiohttp is None:
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(apiRequest, method, path, config, params=params, data=data))
+
+    budget = retryBudget(config)
+    limiter = rateLimiter(config)
+    session = asyncSession(config)
+    timeout = aiohttp.ClientTimeout(total=float(config.timeout))
+    attempt = 0
+
+    while True:
+        pause = budget.remaining()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        if limiter:
+            await limiter.acquireAsync()
+
+        response = None
+        error = None
+        start = time.perf_counter()
+        try:
+            # aiohttp only accepts strings and numbers as query parameters
+            query = {k: str(v) for k, v in params.items()} if params else None
+            async with session.request(method, config.endpoint + path, params=query, data=data, headers=config.headers(), timeout=timeout) as r:
+                response = AsyncResponse(r.status, r.headers, await r.text())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # the request might have been processed already if the connection broke afterwards, so POST is never retried then
+            if method == 'POST':
+                raise
+            error = e
+        finally:
+            addTiming(method + ' ' + path, time.perf_counter() - start)
+
+        delay = nextRetry(method, path, config, attempt, response, error)
+        if delay is None:
+            if error:
+                raise error
+            return response
+
+        await asyncio.sleep(delay)
+        attempt += 1
+
+async def apiSendAsync(method: str, path: str, config: Config, params: dict = None, data: dict = None):
+    """Do a POST, PUT or DELETE request and return the response, same as apiSend. Returns None if nothing was sent because of a missing API key or readonly mode.
+    Raises one of REQUEST_ERRORS if the API could not be reached"""
+    # check if headers are correctly set for authorization
+    if not config.headers():
+        return None
+
+    if not params:
+        params = config.params()
+
+    dataStr = json.dumps(data) if data else ''
+
+    if config.debug:
+        # print only the parts that are set
+        print(' '.join(filter(None, [method, config.endpoint + path + toParamString(params), dataStr])))
+
+    if config.readonly:
+        return None
+
+    # Make request to API endpoint
+    response = await apiRequestAsync(method, path, config, data=dataStr if method != 'DELETE' else None)
+
+    # cached collections are outdated as soon as anything has been changed
+    if response.ok:
+        apiDataChanged(config)
+
+    return response
+
+def runAsync(func, items, limit: int = 100, callback = None):
+    """Run the coroutine func(item) for each item on one event loop with at most limit calls in flight and return the results in the same order as items.
+    If a call raises an exception, the exception is returned as result for this item instead.
+    The optional callback(item, result) is called as soon as a result is available. Must not be called from a running event loop."""
+
+    items = list(items)
+    limit = max(1, int(limit))
+
+    async def main():
+        if aiohttp is None:
+            # without aiohttp each request in flight needs a thread of the default executor
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=limit))
+
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(item):
+            async with semaphore:
+                try:
+                    result = await func(item)
+                except Exception as e:
+                    result = e
+
+            if callback:
+                callback(item, result)
+            return result
+
+        try:
+            return await asyncio.gather(*[run(item) for item in items])
+        finally:
+            await closeAsyncSession()
+
+    if not items:
+        return []
+
+    return asyncio.run(main())
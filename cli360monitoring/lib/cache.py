@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .config import Config
+
+# response cache shared by all API calls of this process
+_cache = None
+_cache_lock = threading.Lock()
+
+# endpoints whose responses contain credentials and therefore are never written to disk
+UNCACHEABLE_PATHS = ('usertoken', 'magiclink')
+
+class ResponseCache(object):
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.directory = os.path.expanduser(config.cache_directory)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, path: str, params: dict):
+        """Return cache key for the specified endpoint, params and API key. The API key itself is only stored as part of the hash"""
+        key = json.dumps([self.config.endpoint, path, sorted((str(k), str(v)) for k, v in params.items()), self.config.api_key])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def isCacheable(self, path: str):
+        """Return True if responses of the specified endpoint may be stored in the cache, False for endpoints returning credentials"""
+        return path.strip('/').split('/')[0] not in UNCACHEABLE_PATHS
+
+    def filename(self, path: str, params: dict):
+        """Return name of the file that caches the response for the specified request"""
+        return os.path.join(self.directory, self.key(path, params) + '.json')
+
+    def get(self, path: str, params: dict, ttl: float = None):
+        """Return cached JSON response if available and not expired, otherwise None. By default entries expire after ttl-seconds"""
+
+        if not self.isCacheable(path):
+            return None
+
+        filename = self.filename(path, params)
+        response_json = None
+
+        if ttl is None:
+            ttl = float(self.config.cache_ttl)
+
+        if not self.config.cache_refresh:
+            try:
+                if os.path.getmtime(filename) + ttl > time.time():
+                    with open(filename) as file:
+                        response_json = json.load(file)
+            except (OSError, ValueError):
+                response_json = None
+
+        with self.lock:
+            if response_json is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return response_json
+
+    def set(self, path: str, params: dict, response_json):
+        """Store JSON response in cache and evict the oldest entries if the cache exceeds its max size"""
+
+        if not self.isCacheable(path):
+            return
+
+        filename = self.filename(path, params)
+        try:
+            # cached responses are only readable by the current user
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+            # write to temporary file first to not leave broken cache entries behind for concurrent processes
+            tmp_filename = filename + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+            with os.fdopen(os.open(tmp_filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as file:
+                json.dump(response_json, file)
+            os.replace(tmp_filename, filename)
+
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self):
+        """Remove the least recently written entries until the cache fits into its max size (in MB)"""
+
+        max_size = float(self.config.cache_max_size) * 1024 * 1024
+        entries = []
+        total_size = 0
+
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove all cached responses, e.g. after data was changed"""
+
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith('.json'):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+
+def responseCache(config: Config):
+    """Return the response cache shared by all API calls or None if caching is disabled"""
+    global _cache
+
+    if not config.cache_enabled or config.no_cache:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(config)
+
+    return _cache
+
+def printCacheStats():
+    """Print number of cache hits and misses if the response cache was used"""
+    if _cache is not None:
+        print('Cache:', _cache.hits, 'hits,', _cache.misses, 'misses')
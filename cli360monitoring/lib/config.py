@@ -16,11 +16,35 @@ class Config(object):
         self.api_key = ''
         self.usertoken = ''
         self.max_items = 5000
+        self.page_size = 1000
+        self.notification_chunk_days = 30
         self.debug = False
+        self.timings = False
         self.readonly = False
         self.hide_ids = False
         self.delimiter = ','
         self.last_version_check = ''
+        self.latest_version = ''
+        self.version_check = True
+
+        self.pool_connections = 10
+        self.pool_maxsize = 10
+        self.keep_alive = True
+        self.max_workers = 8
+        self.timeout = 30
+        self.retries = 3
+        self.retry_backoff = 1.0
+        self.retry_budget = 50
+        self.rate_limit = 0
+        self.rate_burst = 10
+
+        self.cache_enabled = False
+        self.no_cache = False
+        self.cache_refresh = False
+        self.cache_ttl = 300
+        self.cache_history_ttl = 30
+        self.cache_max_size = 100
+        self.cache_directory = '~/.cache/360monitoring'
 
         self.threshold_uptime = 99.0
         self.threshold_ttfb = 1.0
@@ -67,6 +91,12 @@ class Config(object):
                 if 'last-version-check' in parser['General']:
                     self.last_version_check = parser['General']['last-version-check']
 
+                if 'latest-version' in parser['General']:
+                    self.latest_version = parser['General']['latest-version']
+
+                if 'version-check' in parser['General']:
+                    self.version_check = (parser['General']['version-check'] == 'True')
+
             if 'Connection' in parser.sections():
                 if 'endpoint' in parser['Connection']:
                     self.endpoint = parser['Connection']['endpoint']
@@ -80,6 +110,12 @@ class Config(object):
                 if 'max-items' in parser['Connection']:
                     self.max_items = parser['Connection']['max-items']
 
+                if 'page-size' in parser['Connection']:
+                    self.page_size = parser['Connection']['page-size']
+
+                if 'notification-chunk-days' in parser['Connection']:
+                    self.notification_chunk_days = parser['Connection']['notification-chunk-days']
+
                 if 'hide-ids' in parser['Connection']:
                     self.hide_ids = (parser['Connection']['hide-ids'] == 'True')
 
@@ -89,6 +125,52 @@ class Config(object):
                 if 'readonly' in parser['Connection']:
                     self.readonly = (parser['Connection']['readonly'] == 'True')
 
+                if 'pool-connections' in parser['Connection']:
+                    self.pool_connections = parser['Connection']['pool-connections']
+
+                if 'pool-maxsize' in parser['Connection']:
+                    self.pool_maxsize = parser['Connection']['pool-maxsize']
+
+                if 'keep-alive' in parser['Connection']:
+                    self.keep_alive = (parser['Connection']['keep-alive'] == 'True')
+
+                if 'max-workers' in parser['Connection']:
+                    self.max_workers = parser['Connection']['max-workers']
+
+                if 'timeout' in parser['Connection']:
+                    self.timeout = parser['Connection']['timeout']
+
+                if 'retries' in parser['Connection']:
+                    self.retries = parser['Connection']['retries']
+
+                if 'retry-backoff' in parser['Connection']:
+                    self.retry_backoff = parser['Connection']['retry-backoff']
+
+                if 'retry-budget' in parser['Connection']:
+                    self.retry_budget = parser['Connection']['retry-budget']
+
+                if 'rate-limit' in parser['Connection']:
+                    self.rate_limit = parser['Connection']['rate-limit']
+
+                if 'rate-burst' in parser['Connection']:
+                    self.rate_burst = parser['Connection']['rate-burst']
+
+            if 'Cache' in parser.sections():
+                if 'enabled' in parser['Cache']:
+                    self.cache_enabled = (parser['Cache']['enabled'] == 'True')
+
+                if 'ttl-seconds' in parser['Cache']:
+                    self.cache_ttl = parser['Cache']['ttl-seconds']
+
+                if 'history-ttl-days' in parser['Cache']:
+                    self.cache_history_ttl = parser['Cache']['history-ttl-days']
+
+                if 'max-size-mb' in parser['Cache']:
+                    self.cache_max_size = parser['Cache']['max-size-mb']
+
+                if 'directory' in parser['Cache']:
+                    self.cache_directory = parser['Cache']['directory']
+
             if 'Thresholds' in parser.sections():
                 if 'min-uptime-percent' in parser['Thresholds']:
                     self.threshold_uptime = parser['Thresholds']['min-uptime-percent']
@@ -114,15 +196,36 @@ class Config(object):
         parser = configparser.ConfigParser()
         parser['General'] = {
             'last-version-check': self.last_version_check,
+            'latest-version': self.latest_version,
+            'version-check': self.version_check,
         }
         parser['Connection'] = {
             'api-key': self.api_key,
             'usertoken': self.usertoken,
             'endpoint': self.endpoint,
             'max-items': self.max_items,
+            'page-size': self.page_size,
+            'notification-chunk-days': self.notification_chunk_days,
             'hide-ids': self.hide_ids,
             'debug': self.debug,
             'readonly': self.readonly,
+            'pool-connections': self.pool_connections,
+            'pool-maxsize': self.pool_maxsize,
+            'keep-alive': self.keep_alive,
+            'max-workers': self.max_workers,
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'retry-backoff': self.retry_backoff,
+            'retry-budget': self.retry_budget,
+            'rate-limit': self.rate_limit,
+            'rate-burst': self.rate_burst,
+        }
+        parser['Cache'] = {
+            'enabled': self.cache_enabled,
+            'ttl-seconds': self.cache_ttl,
+            'history-ttl-days': self.cache_history_ttl,
+            'max-size-mb': self.cache_max_size,
+            'directory': self.cache_directory,
         }
         parser['Thresholds'] = {
             'min-uptime-percent': self.threshold_uptime,
@@ -148,6 +251,7 @@ class Config(object):
             print('config file:'.ljust(30) + f"{bcolors.WARNING}" + self.filename + f" does not exist. Please run \"360monitoring config save --api-key YOUR_API_KEY\" to configure.{bcolors.ENDC}")
 
         print('CLI version:'.ljust(30), self.version)
+        print('version check:'.ljust(30), self.version_check)
         print()
         print('Connection')
         print('----------')
@@ -164,9 +268,29 @@ class Config(object):
             print('usertoken:'.ljust(30) + f"{bcolors.FAIL}No usertoken specified in " + self.filename + f". Please run \"360monitoring config save --usertoken YOUR_TOKEN\" to use it for creating magic links.{bcolors.ENDC}")
 
         print('max items:'.ljust(30), self.max_items)
+        print('page size:'.ljust(30), self.page_size)
+        print('notification chunk days:'.ljust(30), self.notification_chunk_days)
         print('hide ids:'.ljust(30), self.hide_ids)
         print('debug:'.ljust(30), self.debug)
         print('readonly:'.ljust(30), self.readonly)
+        print('pool connections:'.ljust(30), self.pool_connections)
+        print('pool maxsize:'.ljust(30), self.pool_maxsize)
+        print('keep alive:'.ljust(30), self.keep_alive)
+        print('max workers:'.ljust(30), self.max_workers)
+        print('timeout:'.ljust(30), self.timeout)
+        print('retries:'.ljust(30), self.retries)
+        print('retry backoff:'.ljust(30), self.retry_backoff)
+        print('retry budget:'.ljust(30), self.retry_budget)
+        print('rate limit:'.ljust(30), self.rate_limit)
+        print('rate burst:'.ljust(30), self.rate_burst)
+        print()
+        print('Cache')
+        print('-----')
+        print('enabled:'.ljust(30), self.cache_enabled)
+        print('ttl seconds:'.ljust(30), self.cache_ttl)
+        print('history ttl days:'.ljust(30), self.cache_history_ttl)
+        print('max size mb:'.ljust(30), self.cache_max_size)
+        print('directory:'.ljust(30), self.cache_directory)
         print()
         print('Thresholds')
         print('----------')
@@ -2,11 +2,12 @@
 
 import json
 from http import HTTPStatus
-from prettytable import PrettyTable
 
-from .api import apiGet, apiPost, apiDelete
+from .api import apiPost, apiDelete
+from .repository import repository
 from .config import Config
-from .functions import printError, printWarn
+from .functions import printError, printWarn, printNDJSON
+from .tables import SortableTable
 
 class Contacts(object):
 
@@ -15,7 +16,7 @@ class Contacts(object):
         self.format = format
         self.contacts = None
 
-        self.table = PrettyTable(field_names=['ID', 'Name', 'Email', 'Phone', 'Method'])
+        self.table = SortableTable(field_names=['ID', 'Name', 'Email', 'Phone', 'Method'])
         self.table.align['ID'] = 'l'
         self.table.align['Name'] = 'l'
         self.table.align['Email'] = 'l'
@@ -29,7 +30,7 @@ class Contacts(object):
         if self.contacts != None:
             return True
 
-        response_json = apiGet('contacts', self.config)
+        response_json = repository().get('contacts', self.config, key='contacts')
         if response_json:
             if 'contacts' in response_json:
                 self.contacts = response_json['contacts']
@@ -105,23 +106,10 @@ class Contacts(object):
         """Print table if table format requested"""
 
         if (self.format == 'table'):
-            if self.config.hide_ids:
-                self.table.del_column('ID')
-
-            if sort:
-                # if sort contains the column index instead of the column name, get the column name instead
-                if sort.isdecimal():
-                    sort = self.table.get_csv_string().split(',')[int(sort) - 1]
-            else:
-                sort = None
-
-            if limit > 0:
-                print(self.table.get_string(sortby=sort, reversesort=reverse, start=0, end=limit))
-            else:
-                print(self.table.get_string(sortby=sort, reversesort=reverse))
+            print(self.table.getString(sort=sort, reverse=reverse, limit=limit, hideColumns=['ID'] if self.config.hide_ids else []))
 
         elif (self.format == 'csv'):
-            print(self.table.get_csv_string(delimiter=self.config.delimiter))
+            print(self.table.getCsvString(delimiter=self.config.delimiter))
 
     def print(self, contact):
         """Print the data of the specified contact"""
@@ -129,6 +117,9 @@ class Contacts(object):
         if (self.format == 'json'):
             print(json.dumps(contact, indent=4))
             return
+        elif (self.format == 'ndjson'):
+            printNDJSON(contact)
+            return
 
         id = contact['id']
         name = contact['name']
@@ -136,4 +127,4 @@ class Contacts(object):
         phone = contact['phonenumber'] if 'phonenumber' in contact else ''
         method = contact['method'] if 'method' in contact else ''
 
-        self.table.add_row([id, name, email, phone, method])
+        self.table.addRow([id, name, email, phone, method])
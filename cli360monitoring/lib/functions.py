@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import json
 from datetime import datetime, timedelta
 from .bcolors import bcolors
 
@@ -11,6 +12,10 @@ def printWarn(*args):
     print(f"{bcolors.WARNING}", sep='', end='')
     print(*args, f"{bcolors.ENDC}")
 
+def printNDJSON(data):
+    """Print data as compact JSON in a single line (newline delimited JSON)"""
+    print(json.dumps(data, separators=(',', ':')))
+
 def formatDowntime(seconds):
     if seconds == 0:
         return 'none'
@@ -32,6 +37,12 @@ def formatDowntime(seconds):
         seconds = ((seconds % 86400) % 3600) % 60
         return f"{days} days, {hours} hours, {minutes} minutes, {seconds} seconds"
 
+def formatTimestamp(timestamp, missing: str = ''):
+    """Return the specified timestamp as date and time text or missing if there is no timestamp, e.g. for alerts that are still open"""
+    if not timestamp:
+        return missing
+    return datetime.fromtimestamp(float(timestamp)).strftime('%Y-%m-%d %H:%M:%S')
+
 def formatTimespan(startTimestamp, endTimestamp, dateTimeFormat: str = '%Y-%m-%d'):
     # if end date is today
     if datetime.today().strftime('%Y-%m-%d') == endTimestamp.strftime('%Y-%m-%d'):
@@ -7,7 +7,7 @@ from prettytable import PrettyTable
 
 from .api import apiGet, apiPost, apiDelete
 from .config import Config
-from .functions import printError, printWarn
+from .functions import printError, printWarn, printNDJSON
 
 class Incidents(object):
 
@@ -125,6 +125,9 @@ class Incidents(object):
         if (self.format == 'json'):
             print(json.dumps(incident, indent=4))
             return
+        elif (self.format == 'ndjson'):
+            printNDJSON(incident)
+            return
 
         id = incident['id']
         name = incident['name'] if 'name' in incident else ''
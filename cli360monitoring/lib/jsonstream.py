@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import json
+import codecs
+
+WHITESPACE = ' \t\n\r'
+
+class JSONStream(object):
+    """Incremental parser for a JSON object that yields the items of one of its arrays, e.g. the servers of {"servers": [...], "total": 123},
+    while the response is still being received. Only the current item is kept in memory"""
+
+    def __init__(self, chunks, key: str):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def read(self):
+        """Append the next chunk to the buffer and return False if there is no more data"""
+
+        if self.eof:
+            return False
+
+        # drop the part of the buffer that has already been parsed
+        if self.pos > 65536:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.buffer += self.utf8.decode(b'', final=True)
+            self.eof = True
+            return False
+
+        self.buffer += self.utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character or empty string at the end of data"""
+
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read():
+                return ''
+
+    def expect(self, chars: str):
+        """Consume the next character which must be one of chars and return it"""
+
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError('Expected ' + ' or '.join(repr(c) for c in chars) + ' at position ' + str(self.pos))
+        self.pos += 1
+        return c
+
+    def value(self):
+        """Decode and return the next complete JSON value"""
+
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+
+                # a number might continue in the next chunk, so the value is only complete if it is followed by a delimiter
+                next = end
+                while next < len(self.buffer) and self.buffer[next] in WHITESPACE:
+                    next += 1
+                if (next < len(self.buffer) and self.buffer[next] in ',:]}') or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.read()
+
+    def items(self):
+        """Yield the items of the array with the key of this stream. Yields nothing if the object does not contain the key"""
+
+        self.expect('{')
+        if self.peek() == '}':
+            return
+
+        while True:
+            name = self.value()
+            self.expect(':')
+
+            if name == self.key and self.peek() == '[':
+                self.pos += 1
+                if self.peek() == ']':
+                    return
+                while True:
+                    yield self.value()
+                    if self.expect(',]') == ']':
+                        return
+
+            # skip values of other keys
+            self.value()
+            if self.expect(',}') == '}':
+                return
+
+def iterArrayItems(chunks, key: str):
+    """Yield the items of the array with the specified key of a JSON object received as iterable of (byte) chunks"""
+    yield from JSONStream(chunks, key).items()
@@ -2,11 +2,11 @@
 
 import json
 from http import HTTPStatus
-from prettytable import PrettyTable
 
-from .api import apiGet
+from .repository import repository
 from .config import Config
-from .functions import printError, printWarn
+from .functions import printError, printWarn, printNDJSON
+from .tables import SortableTable
 
 class Nodes(object):
 
@@ -15,7 +15,7 @@ class Nodes(object):
         self.format = format
         self.nodes = None
 
-        self.table = PrettyTable(field_names=['ID', 'Name'])
+        self.table = SortableTable(field_names=['ID', 'Name'])
         self.table.align['ID'] = 'l'
         self.table.align['Name'] = 'l'
 
@@ -26,7 +26,7 @@ class Nodes(object):
         if self.nodes != None:
             return True
 
-        response_json = apiGet('nodes', self.config)
+        response_json = repository().get('nodes', self.config)
         if response_json:
             if 'nodes' in response_json:
                 self.nodes = response_json['nodes']
@@ -59,37 +59,55 @@ class Nodes(object):
             self.printFooter(sort=sort, reverse=reverse, limit=limit)
 
     def getNodeId(self, name: str):
-        """Return Node Id for the location with the specified name. Only the first matching entry (exact match) is returned or empty string if not found"""
+        """Return Node Id for the location with the specified name. An exact match of the name is preferred, otherwise the first location containing the name is returned or empty string if not found"""
 
         if name and self.fetchData():
-            # Iterate through list of nodes and find the specified one
+            position = repository().lookup(self.nodes, 'pretty_name').get(name)
+            if position is not None:
+                return self.nodes[position]['id']
+
+            # Iterate through list of nodes and find the first one containing the name
             for node in self.nodes:
                 if name in node['pretty_name']:
                     return node['id']
 
         return ''
 
+    def getNodeIds(self, names):
+        """Return dict of each specified location name to its Node Id or empty string if not found. Nodes are fetched once and all names are resolved against the shared name index"""
+
+        nodeIds = {name: '' for name in names}
+        if not nodeIds or not self.fetchData():
+            return nodeIds
+
+        # exact matches are preferred, using the same name index as getNodeId()
+        lookup = repository().lookup(self.nodes, 'pretty_name')
+
+        pending = []
+        for name in nodeIds:
+            if name in lookup:
+                nodeIds[name] = self.nodes[lookup[name]]['id']
+            elif name:
+                pending.append(name)
+
+        # otherwise the first location containing the name is used, found with a single pass over all nodes
+        for node in self.nodes:
+            if not pending:
+                break
+            for name in [name for name in pending if name in node['pretty_name']]:
+                nodeIds[name] = node['id']
+                pending.remove(name)
+
+        return nodeIds
+
     def printFooter(self, sort: str = '', reverse: bool = False, limit: int = 0):
         """Print table if table format requested"""
 
         if (self.format == 'table'):
-            if self.config.hide_ids:
-                self.table.del_column('ID')
-
-            if sort:
-                # if sort contains the column index instead of the column name, get the column name instead
-                if sort.isdecimal():
-                    sort = self.table.get_csv_string().split(',')[int(sort) - 1]
-            else:
-                sort = None
-
-            if limit > 0:
-                print(self.table.get_string(sortby=sort, reversesort=reverse, start=0, end=limit))
-            else:
-                print(self.table.get_string(sortby=sort, reversesort=reverse))
+            print(self.table.getString(sort=sort, reverse=reverse, limit=limit, hideColumns=['ID'] if self.config.hide_ids else []))
 
         elif (self.format == 'csv'):
-            print(self.table.get_csv_string(delimiter=self.config.delimiter))
+            print(self.table.getCsvString(delimiter=self.config.delimiter))
 
     def print(self, node):
         """Print the data of the specified node"""
@@ -97,6 +115,9 @@ class Nodes(object):
         if (self.format == 'json'):
             print(json.dumps(node, indent=4))
             return
+        elif (self.format == 'ndjson'):
+            printNDJSON(node)
+            return
 
         id = node['id']
         name = node['pretty_name']
@@ -116,4 +137,4 @@ class Nodes(object):
             "id": "60e81944f401963e610a0623"
         }
         '''
-        self.table.add_row([id, name])
+        self.table.addRow([id, name])
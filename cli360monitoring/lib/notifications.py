@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+
+from .api import apiGet, toParamString
+from .cache import responseCache
+from .config import Config
+from .workers import runConcurrent
+
+DAY_SECONDS = 86400
+
+# limits the number of chunk requests in flight for all histories retrieved by this process, e.g. of all servers of "servers events --all"
+_chunk_slots = None
+_chunk_slots_lock = threading.Lock()
+
+def chunkSlots(config: Config):
+    """Return the semaphore shared by all chunk requests of this process, allowing at most max-workers requests at once"""
+    global _chunk_slots
+
+    with _chunk_slots_lock:
+        if _chunk_slots is None:
+            _chunk_slots = threading.BoundedSemaphore(max(1, int(config.max_workers)))
+
+    return _chunk_slots
+
+def notificationChunks(startTimestamp: float, endTimestamp: float, chunkDays: float):
+    """Return list of [start, end] timestamps of the chunks covering the specified period. The chunks start at multiples of their length since the epoch,
+    so that every run requests the same chunks and those that are closed already can be cached. The last chunk ends with the period"""
+
+    if endTimestamp <= startTimestamp:
+        return [[int(startTimestamp), int(endTimestamp)]]
+
+    length = max(1, int(chunkDays * DAY_SECONDS))
+    first = int(startTimestamp) // length * length
+    return [[start, min(start + length, int(endTimestamp))] for start in range(first, int(endTimestamp), length)]
+
+def fetchChunk(path: str, config: Config, startTimestamp: int, endTimestamp: int):
+    """Return list of notifications of the specified chunk or None if they could not be retrieved. Closed chunks are read from and stored in the response cache if enabled"""
+
+    params = config.params()
+    params['start'] = startTimestamp
+    params['end'] = endTimestamp
+
+    # notifications of a chunk that ended already do not change anymore, so they are kept for history-ttl-days
+    cache = responseCache(config) if endTimestamp < time.time() else None
+    ttl = float(config.cache_history_ttl) * DAY_SECONDS
+    if cache:
+        response_json = cache.get(path, params, ttl)
+        if response_json is not None:
+            if config.debug:
+                print('GET ' + config.endpoint + path + toParamString(params) + ' (cached)')
+            return response_json['data']
+
+    response_json = apiGet(path, config, params=params)
+    if not response_json or 'data' not in response_json:
+        return None
+
+    # alerts without end are still open and will be updated later
+    if cache and all(notification.get('end') for notification in response_json['data']):
+        cache.set(path, params, response_json)
+
+    return response_json['data']
+
+def fetchNotifications(path: str, config: Config, startTimestamp: float, endTimestamp: float):
+    """Return all notifications of the specified endpoint, e.g. 'server/ID/notifications', within the specified period or None if they could not be retrieved.
+    Periods longer than notification-chunk-days are split into chunks which are retrieved in parallel, then merged in order of their start time"""
+
+    chunkDays = float(config.notification_chunk_days)
+    if chunkDays <= 0:
+        return fetchChunk(path, config, int(startTimestamp), int(endTimestamp))
+
+    def fetchSlot(chunk):
+        # histories of many servers or sites may be retrieved in parallel, their chunks share the same max-workers requests in flight
+        with chunkSlots(config):
+            return fetchChunk(path, config, chunk[0], chunk[1])
+
+    chunks = notificationChunks(startTimestamp, endTimestamp, chunkDays)
+    results = runConcurrent(fetchSlot, chunks, config.max_workers)
+
+    notifications = []
+    seen = set()
+    for result in results:
+        # a period with a missing chunk would look like a period without any alerts
+        if result is None or isinstance(result, Exception):
+            return None
+
+        for notification in result:
+            # alerts overlapping two chunks are returned for both, alerts starting at the same time are only different if their summary is
+            key = (notification['start'], notification.get('summary'))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            # the chunks may start before and end after the requested period
+            end = float(notification['end']) if notification.get('end') else None
+            if float(notification['start']) <= endTimestamp and (end is None or end >= startTimestamp):
+                notifications.append(notification)
+
+    notifications.sort(key=lambda notification: float(notification['start']))
+    return notifications
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import math
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
+
+from .api import apiGet, apiGetStream
+from .config import Config
+from .functions import printWarn
+
+def fetchPage(path: str, config: Config, params: dict, page: int, pageSize: int):
+    """Return JSON response of the specified page (starting with 1)"""
+    return apiGet(path, config, params=dict(params, page=page, perpage=pageSize), cacheable=True)
+
+def pageTotal(response_json):
+    """Return total number of records of all pages if the API reports it, otherwise None"""
+
+    total = response_json.get('total')
+    if total is None and isinstance(response_json.get('meta'), dict):
+        total = response_json['meta'].get('total')
+
+    try:
+        return int(total) if total is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def iterPages(path: str, key: str, config: Config, params: dict, first):
+    """Yield the records of each page in order, starting with the already fetched first page.
+    If the total number of records is known, all other pages are fetched in parallel, otherwise one after another until a page is not full.
+    Stops at max-items records. If the API returns the first page again because it does not support pages, all records are fetched with a single request instead"""
+
+    max_items = int(config.max_items)
+    page_size = min(int(config.page_size), max_items)
+    seen_ids = set()
+    count = 0
+
+    def newRecords(records):
+        """Return records not seen before, limited to max-items"""
+        nonlocal count
+        result = []
+        for record in records:
+            record_id = record.get('id') if isinstance(record, dict) else None
+            if record_id is not None:
+                if record_id in seen_ids:
+                    continue
+                seen_ids.add(record_id)
+            if count >= max_items:
+                break
+            result.append(record)
+            count += 1
+        return result
+
+    records = first.get(key) or []
+    first_record = records[0] if records else None
+    yield newRecords(records)
+
+    # a page that is not full is the last one
+    if count >= max_items or len(records) < page_size:
+        return
+
+    total = pageTotal(first)
+    if total is not None:
+        last_page = math.ceil(min(total, max_items) / page_size)
+        pages = range(2, last_page + 1)
+        if not pages:
+            return
+
+        # map() returns the pages in order while all of them are fetched in parallel
+        with ThreadPoolExecutor(max_workers=max(1, min(int(config.max_workers), len(pages)))) as executor:
+            for page, response_json in zip(pages, executor.map(lambda page: fetchPage(path, config, params, page, page_size), pages)):
+                records = response_json.get(key) if response_json else None
+                if not records:
+                    printWarn('Failed to fetch page', page, 'of', path)
+                    return
+
+                # the API ignores the page parameter if it returns the first page again
+                if records[0] == first_record:
+                    yield newRecords(fetchUnpaged(path, key, config, params, page_size))
+                    return
+
+                page_records = newRecords(records)
+                if not page_records:
+                    return
+                yield page_records
+    else:
+        page = 2
+        while count < max_items:
+            response_json = fetchPage(path, config, params, page, page_size)
+            records = response_json.get(key) if response_json else None
+            if not records:
+                return
+
+            if records[0] == first_record:
+                yield newRecords(fetchUnpaged(path, key, config, params, page_size))
+                return
+
+            page_records = newRecords(records)
+            if not page_records:
+                return
+            yield page_records
+
+            if len(records) < page_size:
+                return
+            page += 1
+
+def fetchUnpaged(path: str, key: str, config: Config, params: dict, skip: int):
+    """Return the records of a list endpoint that ignores the page parameter with a single request of up to max-items records, without the first skip records already received"""
+
+    if config.debug:
+        print('Endpoint', path, 'does not support pages, fetching all records at once')
+
+    response_json = apiGet(path, config, params=dict(params, perpage=int(config.max_items)), cacheable=True)
+    records = response_json.get(key) if response_json else None
+    if not records:
+        printWarn('Failed to fetch all records of', path)
+        return []
+
+    return records[skip:]
+
+def iterRecords(path: str, key: str, config: Config, params: dict = None, stream: bool = False):
+    """Yield all records of a list endpoint as soon as their page has been fetched, e.g. iterRecords('servers', 'servers', config).
+    With stream=True the pages are fetched one after another and each record is yielded while its page is still being received"""
+
+    if not params:
+        params = config.params()
+
+    if stream:
+        yield from streamRecords(path, key, config, params)
+        return
+
+    first = fetchPage(path, config, params, 1, min(int(config.page_size), int(config.max_items)))
+    if not first or key not in first:
+        return
+
+    for records in iterPages(path, key, config, params, first):
+        yield from records
+
+def streamRecords(path: str, key: str, config: Config, params: dict):
+    """Yield all records of a list endpoint page by page from the response streams, so only a single record is kept in memory at a time"""
+
+    max_items = int(config.max_items)
+    page_size = min(int(config.page_size), max_items)
+    seen_ids = set()
+    count = 0
+    page_count = 0
+
+    def newRecords(records):
+        """Yield records not seen before until max-items records have been yielded"""
+        nonlocal count, page_count
+        for record in records:
+            page_count += 1
+            record_id = record.get('id') if isinstance(record, dict) else None
+            if record_id is not None:
+                if record_id in seen_ids:
+                    continue
+                seen_ids.add(record_id)
+
+            yield record
+            count += 1
+            if count >= max_items:
+                return
+
+    first_id = None
+    page = 1
+    while count < max_items:
+        records = apiGetStream(path, config, key, params=dict(params, page=page, perpage=page_size))
+        first = next(records, None)
+        if first is None:
+            return
+
+        # the API ignores the page parameter if it returns the first page again, then all records are streamed with a single request instead
+        record_id = first.get('id') if isinstance(first, dict) else None
+        if page == 1:
+            first_id = record_id
+        elif record_id is not None and record_id == first_id:
+            records.close()
+            if config.debug:
+                print('Endpoint', path, 'does not support pages, fetching all records at once')
+            yield from newRecords(islice(apiGetStream(path, config, key, params=dict(params, perpage=max_items)), page_size, None))
+            return
+
+        page_count = 0
+        yield from newRecords(chain([first], records))
+
+        # a page that is not full is the last one
+        if page_count < page_size:
+            return
+        page += 1
+
+def apiGetAll(path: str, key: str, config: Config, params: dict = None, record = None):
+    """Return JSON response of the first page of a list endpoint, with the records of all pages (up to max-items) as value of key.
+    If specified, record is called for each record to convert it while the other pages are still being fetched, e.g. ServerRecord"""
+
+    if not params:
+        params = config.params()
+
+    first = fetchPage(path, config, params, 1, min(int(config.page_size), int(config.max_items)))
+    if not first or key not in first:
+        return first
+
+    records = []
+    for page_records in iterPages(path, key, config, params, first):
+        records.extend(map(record, page_records) if record else page_records)
+
+    return dict(first, **{key: records})
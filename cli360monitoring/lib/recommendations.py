@@ -19,9 +19,10 @@ class Recommendations(object):
 
         servers = Servers(self.config)
         if servers.fetchData():
+            issues = servers.issues()
             for server in servers.servers:
-                if servers.hasIssue(server):
-                    self.table.add_row([server['name'], servers.getRecommendation(server)])
+                if server.id in issues:
+                    self.table.add_row([server.name, issues[server.id]])
 
         if (format == 'table'):
             print(self.table)
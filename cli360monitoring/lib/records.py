@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import json
+
+class Record(object):
+    """Slim representation of an entity returned by the API. Only the fields used by the CLI are kept as attributes,
+    the complete JSON is kept as compact UTF-8 bytes and only decoded again if it is needed, e.g. for JSON output"""
+
+    __slots__ = ('raw_json',)
+
+    def __init__(self, data: dict):
+        self.raw_json = json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    @property
+    def raw(self):
+        """Return the complete JSON of this entity as dict"""
+        return json.loads(self.raw_json)
+
+    def get(self, field: str, default = None):
+        """Return the value of the specified field like dict.get(), so records can be indexed the same way as dicts"""
+        return getattr(self, field, default)
+
+class ServerRecord(Record):
+    """Server monitored by the agent"""
+
+    __slots__ = ('id', 'name', 'os', 'status', 'tags', 'ip_address', 'ip_country', 'ip_hoster',
+                 'has_summary', 'cpu_usage_percent', 'mem_usage_percent', 'disk_usage_percent',
+                 'cores', 'memory_total', 'disks', 'wp_toolkit')
+
+    def __init__(self, server: dict):
+        super().__init__(server)
+
+        self.id = server['id']
+        self.name = server['name']
+        self.os = server['os'] if 'os' in server else ''
+        self.status = server['status'] if 'status' in server else ''
+        self.tags = tuple(server['tags']) if 'tags' in server and server['tags'] else ()
+
+        if 'ip_whois' in server and server['ip_whois']:
+            ip_whois = server['ip_whois']
+            self.ip_address = ip_whois['ip'] if 'ip' in ip_whois else ''
+            self.ip_country = ip_whois['country'] if 'country' in ip_whois else ''
+            self.ip_hoster = ip_whois['org'] if 'org' in ip_whois else ''
+        else:
+            self.ip_address = ''
+            self.ip_country = ''
+            self.ip_hoster = ''
+
+        self.has_summary = 'summary' in server
+        self.cpu_usage_percent = server['summary']['cpu_usage_percent'] if self.has_summary else 0
+        self.mem_usage_percent = server['summary']['mem_usage_percent'] if self.has_summary else 0
+        self.disk_usage_percent = server['summary']['disk_usage_percent'] if self.has_summary else 0
+
+        last_data = server['last_data'] if 'last_data' in server and server['last_data'] else {}
+        self.cores = last_data['cores'] if 'cores' in last_data else 0
+        self.memory_total = last_data['memory']['total'] if 'memory' in last_data else 0
+
+        # (mount, free bytes, used bytes) per disk volume
+        self.disks = tuple((disk['mount'], disk['free_bytes'], disk['used_bytes']) for disk in last_data['df']) if 'df' in last_data else ()
+        self.wp_toolkit = last_data['wp-toolkit'] if 'wp-toolkit' in last_data and last_data['wp-toolkit'] else None
+
+class MonitorRecord(Record):
+    """Website monitor"""
+
+    __slots__ = ('id', 'url', 'name', 'code', 'status', 'status_message', 'location', 'uptime_percentage', 'ttfb')
+
+    def __init__(self, monitor: dict):
+        super().__init__(monitor)
+
+        self.id = monitor['id']
+        self.url = monitor['url']
+        self.name = monitor['name'] if 'name' in monitor else ''
+        self.code = monitor['code'] if 'code' in monitor else ''
+        self.status = monitor['status'] if 'status' in monitor else ''
+        self.status_message = monitor['status_message'] if 'status_message' in monitor else ''
+        self.location = monitor['monitor']['name']
+        self.uptime_percentage = float(monitor['uptime_percentage'])
+
+        # time to first byte is None if the site has not been checked yet
+        self.ttfb = float(monitor['last_check']['ttfb']) if 'last_check' in monitor and 'ttfb' in monitor['last_check'] else None
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+from concurrent.futures import Future
+
+from .api import apiGet
+from .pagination import apiGetAll
+from .config import Config
+
+# repository shared by all consumers of this process
+_repository = None
+_repository_lock = threading.Lock()
+
+class Repository(object):
+    """Responses of list endpoints that are downloaded only once per process and shared by all consumers, e.g. the servers for recommendations and WP Toolkit"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.responses = {}
+        self.pending = {}
+        self.requests = {}
+        self.fetches = {}
+        self.indexes = {}
+
+    def key(self, path: str, params: dict):
+        """Return key of the response for the specified endpoint and params"""
+        return json.dumps([path, sorted((str(k), str(v)) for k, v in params.items())])
+
+    def get(self, path: str, config: Config, params: dict = None, key: str = '', record = None):
+        """Return JSON response of the specified endpoint. The API is only called for the first request of an endpoint,
+        concurrent requests for the same endpoint wait for this call instead of sending their own.
+        If key is specified, the endpoint is a paginated list and the records of all pages are returned as value of key, converted by record if specified"""
+
+        if not params:
+            params = config.params()
+
+        response_key = self.key(path, params)
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+            if response_key in self.responses:
+                return self.responses[response_key]
+
+            future = self.pending.get(response_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.pending[response_key] = future
+                self.fetches[path] = self.fetches.get(path, 0) + 1
+
+        if not owner:
+            return future.result()
+
+        response_json = None
+        try:
+            if key:
+                response_json = apiGetAll(path, key, config, params=params, record=record)
+            else:
+                response_json = apiGet(path, config, params=params, cacheable=True)
+        finally:
+            with self.lock:
+                # failed requests are not kept, so the next consumer tries again
+                if response_json:
+                    self.responses[response_key] = response_json
+                del self.pending[response_key]
+            future.set_result(response_json)
+
+        return response_json
+
+    def index(self, items, name: str, build):
+        """Return the index with the specified name for a list of items of a response. The index is built by calling build(items) only once per list"""
+
+        key = (id(items), name)
+        with self.lock:
+            entry = self.indexes.get(key)
+            if entry is not None and entry[0] is items:
+                return entry[1]
+
+        index = build(items)
+        with self.lock:
+            # keep a reference to the items so that their id is not reused for another list
+            self.indexes[key] = (items, index)
+        return index
+
+    def lookup(self, items, field: str):
+        """Return dict of the values of the specified field to the position of the first item having this value"""
+        return self.index(items, 'lookup:' + field, lambda items: buildLookup(items, field))
+
+    def invalidate(self):
+        """Forget all responses and their indexes after data has been changed"""
+        with self.lock:
+            self.responses.clear()
+            self.indexes.clear()
+
+def buildLookup(items, field: str):
+    """Return dict of the values of the specified field to the position of the first item having this value. Items without value are skipped"""
+
+    lookup = {}
+    for position, item in enumerate(items):
+        value = item.get(field)
+        if value and value not in lookup:
+            lookup[value] = position
+    return lookup
+
+def repository():
+    """Return the repository shared by all consumers of this process"""
+    global _repository
+
+    with _repository_lock:
+        if _repository is None:
+            _repository = Repository()
+
+    return _repository
+
+def invalidateRepository():
+    """Forget all shared responses if the repository was used"""
+    if _repository is not None:
+        _repository.invalidate()
+
+def printRepositoryStats():
+    """Print number of API calls and requests per endpoint if the repository was used"""
+    if _repository is not None:
+        with _repository.lock:
+            for path in sorted(_repository.requests):
+                print('Repository:', path, _repository.fetches.get(path, 0), 'fetches,', _repository.requests[path], 'requests')
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+from .config import Config
+from .records import ServerRecord
+
+class Thresholds(object):
+    """Thresholds of the config file, converted to numbers only once instead of for every compared value"""
+
+    __slots__ = ('uptime', 'ttfb', 'free_diskspace', 'cpu_usage', 'mem_usage', 'disk_usage')
+
+    def __init__(self, config: Config):
+        self.uptime = float(config.threshold_uptime)
+        self.ttfb = float(config.threshold_ttfb)
+        self.free_diskspace = float(config.threshold_free_diskspace)
+        self.cpu_usage = float(config.threshold_cpu_usage)
+        self.mem_usage = float(config.threshold_mem_usage)
+        self.disk_usage = float(config.threshold_disk_usage)
+
+def serverRecommendation(server: ServerRecord, thresholds: Thresholds):
+    """Return recommendation text if the specified server has some issue by having a value outside of the expected threshold, otherwise empty string"""
+
+    memory_total = server.memory_total
+    if memory_total > 0 and server.mem_usage_percent >= thresholds.mem_usage:
+        memory_total_gb = memory_total / 1024 / 1024
+        memory_total_gb_recommended = round(memory_total_gb * 2)
+        if (memory_total_gb_recommended % 2) != 0:
+            memory_total_gb_recommended += 1
+        return 'Memory is too small for your workload. Please consider upgrading to a larger server with at least ' + str(memory_total_gb_recommended) + ' GB memory.'
+
+    cores = server.cores
+    if cores > 0 and server.cpu_usage_percent >= thresholds.cpu_usage:
+        cores_recommended = round(cores * 2)
+        if (cores % 2) != 0:
+            cores += 1
+        return 'CPU is too small for your workload. Please consider upgrading to a larger server with at least ' + str(cores_recommended) + ' CPU cores.'
+
+    for mount, free_disk_space, used_disk_space in server.disks:
+        total_disk_space = free_disk_space + used_disk_space
+        free_disk_space_percent = free_disk_space / total_disk_space * 100
+
+        if free_disk_space_percent <= thresholds.free_diskspace:
+            total_disk_space_gb = total_disk_space / 1024 / 1024
+            total_disk_space_gb_recommended = round(total_disk_space_gb * 2)
+            if (total_disk_space_gb_recommended % 2) != 0:
+                total_disk_space_gb_recommended += 1
+            return 'Disk volume "' + mount + '" is almost exhausted. Please consider extending your storage volume or upgrading to a larger server with at least ' + str(total_disk_space_gb_recommended) + ' GB disk space for this volume.'
+
+    return ''
+
+def buildServerIssues(servers, thresholds: Thresholds):
+    """Evaluate all servers once and return dict of server ID to recommendation text of the servers having some issue"""
+
+    issues = {}
+    for server in servers:
+        recommendation = serverRecommendation(server, thresholds)
+        if recommendation:
+            issues[server.id] = recommendation
+    return issues
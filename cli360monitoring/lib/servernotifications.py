@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
 import json
-from datetime import datetime
+import heapq
 from http import HTTPStatus
 from prettytable import PrettyTable
 
-from .api import apiGet
 from .config import Config
-from .functions import printError, printWarn
+from .functions import printError, printWarn, printNDJSON, formatTimestamp
+from .notifications import fetchNotifications
+from .workers import runConcurrent
 
 class ServerNotifications(object):
 
@@ -29,22 +30,16 @@ class ServerNotifications(object):
         if self.notifications != None:
             return True
 
-        params = self.config.params()
-        params['start'] = int(startTimestamp)
-        params['end'] = int(endTimestamp)
+        self.notifications = self.getNotifications(serverId, startTimestamp, endTimestamp)
+        return self.notifications != None
 
-        response_json = apiGet('server/' + serverId + '/notifications', self.config, params=params)
-        if response_json:
-            if 'data' in response_json:
-                self.notifications = response_json['data']
-                return True
-            else:
-                printWarn('No notifications found for server', serverId)
-                self.notifications = None
-                return False
-        else:
-            self.notifications = None
-            return False
+    def getNotifications(self, serverId: str, startTimestamp: float, endTimestamp: float):
+        """Return list of all alerts of a specified server in the specified time period or None if they could not be retrieved"""
+
+        notifications = fetchNotifications('server/' + serverId + '/notifications', self.config, startTimestamp, endTimestamp)
+        if notifications is None:
+            printWarn('No notifications found for server', serverId)
+        return notifications
 
     def list(self, serverId: str, startTimestamp: float, endTimestamp: float, sort: str = '', reverse: bool = False, limit: int = 0):
         """Iterate through list of server notifications and print details"""
@@ -62,6 +57,69 @@ class ServerNotifications(object):
 
             self.printFooter(sort=sort, reverse=reverse, limit=limit)
 
+    def listAll(self, servers, startTimestamp: float, endTimestamp: float, limit: int = 0, maxWorkers: int = 0):
+        """Retrieve the alerts of all specified servers in parallel and print them merged in order of their start time, each with the name of its server"""
+
+        if not servers:
+            printWarn('No servers found')
+            return False
+
+        results = runConcurrent(lambda server: self.getNotifications(server.id, startTimestamp, endTimestamp), servers, maxWorkers if maxWorkers > 0 else self.config.max_workers)
+
+        # the alerts of each server are sorted by start time, so they only need to be merged instead of sorting all alerts again
+        events = []
+        num_failed = 0
+        for server, notifications in zip(servers, results):
+            if notifications is None or isinstance(notifications, Exception):
+                num_failed += 1
+                # getNotifications() already warned if the API returned no notifications, only exceptions are not reported yet
+                if isinstance(notifications, Exception):
+                    printWarn('Failed to retrieve notifications for server', server.name, '(' + str(notifications) + ')')
+                continue
+
+            notifications.sort(key=lambda notification: float(notification['start']))
+            events.append([(float(notification['start']), server.id, server.name, notification) for notification in notifications])
+
+        self.table = PrettyTable(field_names=['Start', 'End', 'Server name', 'Status', 'Summary'])
+        self.table.align['Start'] = 'c'
+        self.table.align['End'] = 'c'
+        self.table.align['Server name'] = 'l'
+        self.table.align['Status'] = 'c'
+        self.table.align['Summary'] = 'l'
+
+        if (self.format == 'csv'):
+            print(self.config.delimiter.join(['Start', 'End', 'Server ID', 'Server name', 'Status', 'Summary']))
+        elif (self.format == 'json'):
+            json_events = []
+
+        num_printed = 0
+        for start, serverId, serverName, notification in heapq.merge(*events, key=lambda event: event[0]):
+            if (self.format == 'json'):
+                json_events.append(dict(notification, server_id=serverId, server_name=serverName))
+            elif (self.format == 'ndjson'):
+                printNDJSON(dict(notification, server_id=serverId, server_name=serverName))
+            else:
+                startText = formatTimestamp(start)
+                endText = formatTimestamp(notification.get('end'), 'open')
+                if (self.format == 'csv'):
+                    print(self.config.delimiter.join([startText, endText, serverId, serverName, str(notification['status']), str(notification['summary'])]))
+                else:
+                    self.table.add_row([startText, endText, serverName, notification['status'], notification['summary']])
+
+            num_printed += 1
+            if limit > 0 and num_printed >= limit:
+                break
+
+        if (self.format == 'json'):
+            print(json.dumps(json_events, indent=4))
+        elif (self.format == 'table'):
+            print(self.table)
+
+        if num_failed > 0:
+            printWarn('Failed to retrieve notifications for', num_failed, 'of', len(servers), 'servers')
+
+        return num_failed == 0
+
     def printFooter(self, sort: str = '', reverse: bool = False, limit: int = 0):
         """Print table if table format requested"""
 
@@ -91,10 +149,13 @@ class ServerNotifications(object):
         if (self.format == 'json'):
             print(json.dumps(notification, indent=4))
             return
+        elif (self.format == 'ndjson'):
+            printNDJSON(notification)
+            return
 
-        startTimestamp = datetime.fromtimestamp(float(notification['start']))
-        endTimestamp = datetime.fromtimestamp(float(notification['end']))
+        startText = formatTimestamp(notification['start'])
+        endText = formatTimestamp(notification.get('end'), 'open')
         status = notification['status']
         summary = notification['summary']
 
-        self.table.add_row([startTimestamp.strftime('%Y-%m-%d %H:%M:%S'), endTimestamp.strftime('%Y-%m-%d %H:%M:%S'), status, summary])
+        self.table.add_row([startText, endText, status, summary])
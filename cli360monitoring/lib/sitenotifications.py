@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 
 import json
-from datetime import datetime
 from http import HTTPStatus
 from prettytable import PrettyTable
 
-from .api import apiGet
 from .config import Config
-from .functions import printError, printWarn
+from .functions import printError, printWarn, printNDJSON, formatTimestamp
+from .notifications import fetchNotifications
 
 class SiteNotifications(object):
 
@@ -29,23 +28,13 @@ class SiteNotifications(object):
         if self.notifications != None:
             return True
 
-        params = self.config.params()
-        params['start'] = int(startTimestamp)
-        params['end'] = int(endTimestamp)
-
-        response_json = apiGet('monitor/' + siteId + '/notifications', self.config, params=params)
-        if response_json:
-            if 'data' in response_json:
-                self.notifications = response_json['data']
-                return True
-            else:
-                printWarn('No notifications found for site', siteId)
-                self.notifications = None
-                return False
-        else:
-            self.notifications = None
+        self.notifications = fetchNotifications('monitor/' + siteId + '/notifications', self.config, startTimestamp, endTimestamp)
+        if self.notifications == None:
+            printWarn('No notifications found for site', siteId)
             return False
 
+        return True
+
     def list(self, siteId: str, startTimestamp: float, endTimestamp: float, sort: str = '', reverse: bool = False, limit: int = 0):
         """Iterate through list of site notifications and print details"""
 
@@ -91,10 +80,13 @@ class SiteNotifications(object):
         if (self.format == 'json'):
             print(json.dumps(notification, indent=4))
             return
+        elif (self.format == 'ndjson'):
+            printNDJSON(notification)
+            return
 
-        startTimestamp = datetime.fromtimestamp(float(notification['start']))
-        endTimestamp = datetime.fromtimestamp(float(notification['end']))
+        startText = formatTimestamp(notification['start'])
+        endText = formatTimestamp(notification.get('end'), 'open')
         status = notification['status']
         summary = notification['summary']
 
-        self.table.add_row([startTimestamp.strftime('%Y-%m-%d %H:%M:%S'), endTimestamp.strftime('%Y-%m-%d %H:%M:%S'), status, summary])
+        self.table.add_row([startText, endText, status, summary])
@@ -1,14 +1,22 @@
 #!/usr/bin/env python3
 
+import os
 import json
 from datetime import datetime
 from http import HTTPStatus
 from prettytable import PrettyTable
 
-from .api import apiGet, apiPost, apiDelete
+from .api import apiGet, apiPost, apiSend, bulkWrites
+from .repository import repository
 from .config import Config
-from .functions import printError, printWarn, formatDowntime, formatTimespan
+from .functions import printError, printWarn, printNDJSON, formatDowntime, formatTimespan
 from .bcolors import bcolors
+from .tables import SortableTable
+from .records import MonitorRecord
+from .rules import Thresholds
+from .sitenotifications import SiteNotifications
+from .uptime import DowntimeIndex
+from .workers import runConcurrent
 
 class Sites(object):
 
@@ -16,8 +24,9 @@ class Sites(object):
         self.config = config
         self.format = format
         self.monitors = None
+        self.thresholds = Thresholds(config)
 
-        self.table = PrettyTable(field_names=['ID', 'URL', 'Status', 'Uptime %', 'Time to first Byte', 'Location'])
+        self.table = SortableTable(field_names=['ID', 'URL', 'Status', 'Uptime %', 'Time to first Byte', 'Location'])
         self.table.align['ID'] = 'l'
         self.table.align['URL'] = 'l'
         self.table.min_width['URL'] = 25
@@ -37,7 +46,7 @@ class Sites(object):
         if self.monitors != None:
             return True
 
-        response_json = apiGet('monitors', self.config)
+        response_json = repository().get('monitors', self.config, key='monitors', record=MonitorRecord)
         if response_json:
             if 'monitors' in response_json:
                 self.monitors = response_json['monitors']
@@ -54,21 +63,37 @@ class Sites(object):
         """Return Site Id for the monitor with the specified url or name. Only the first matching entry (exact match) is returned or empty string if not found"""
 
         if url and self.fetchData():
-            # Iterate through list of monitors and find the specified one
-            for monitor in self.monitors:
-                if monitor['url'] == url or (monitor['name'] and monitor['name'] == url):
-                    return monitor['id']
+            position = self.findSite(url)
+            if position is not None:
+                return self.monitors[position].id
 
         return ''
 
+    def getSiteIds(self, urls):
+        """Return dict of each specified url or name to the Site Id of its monitor or empty string if not found"""
+
+        if not self.fetchData():
+            return {url: '' for url in urls}
+
+        siteIds = {}
+        for url in urls:
+            position = self.findSite(url)
+            siteIds[url] = self.monitors[position].id if position is not None else ''
+        return siteIds
+
+    def findSite(self, url: str):
+        """Return position of the first monitor with the specified url or name or None if not found"""
+
+        positions = [position for position in (repository().lookup(self.monitors, 'url').get(url), repository().lookup(self.monitors, 'name').get(url)) if position is not None]
+        return min(positions) if positions else None
+
     def getSiteUrl(self, id: str):
         """Return Site Url for the monitor with the specified id"""
 
         if id and self.fetchData():
-            # Iterate through list of monitors and find the specified one
-            for monitor in self.monitors:
-                if monitor['id'] == id:
-                    return monitor['url']
+            position = repository().lookup(self.monitors, 'id').get(id)
+            if position is not None:
+                return self.monitors[position].url
 
         return ''
 
@@ -79,7 +104,7 @@ class Sites(object):
 
             # if JSON was requested and no filters, then just print it without iterating through
             if (self.format == 'json' and not (id or url or name or location or pattern or issuesOnly or limit > 0)):
-                print(json.dumps(self.monitors, indent=4))
+                print(json.dumps([monitor.raw for monitor in self.monitors], indent=4))
                 return
 
             self.printHeader()
@@ -90,11 +115,11 @@ class Sites(object):
 
             for monitor in self.monitors:
                 if (id or url or name or location or pattern):
-                    if (id and monitor['id'] == id) \
-                        or (url and monitor['url'] == url) \
-                        or (name and 'name' in monitor and monitor['name'] == name) \
-                        or (location and location in monitor['monitor']['name']) \
-                        or (pattern and pattern in monitor['url']):
+                    if (id and monitor.id == id) \
+                        or (url and monitor.url == url) \
+                        or (name and monitor.name == name) \
+                        or (location and location in monitor.location) \
+                        or (pattern and pattern in monitor.url):
                         if (not issuesOnly) or self.hasIssue(monitor):
                             self.print(monitor)
                 else:
@@ -119,11 +144,9 @@ class Sites(object):
                 protocol = 'https'
 
             # check if monitored url already exists unless --force is specified
-            if not force:
-                for monitor in self.monitors:
-                    if monitor['url'] == url:
-                        print(url, 'already exists and will not be added')
-                        return
+            if not force and url in repository().lookup(self.monitors, 'url'):
+                print(url, 'already exists and will not be added')
+                return
 
             # other parameters:
             #   port: int (e.g. 443, 80)
@@ -147,37 +170,212 @@ class Sites(object):
             }
             apiPost('monitors', self.config, data=data, successMessage='Added site monitor: ' + url, errorMessage='Failed to add site monitor ' + url + '')
 
-    def remove(self, id: str = '', url: str = '', name: str = '', location: str = '', pattern: str = ''):
-        """Remove the monitor for the given URL"""
+    def addBulk(self, urls, protocol: str = 'https', name: str = '', port: int = 443, keyword: str = '', matchType:str = '', nodeId: str = '', force: bool = False, resultFile: str = ''):
+        """Add monitors for all given URLs in parallel, print a summary and optionally write the result per URL as JSON to resultFile"""
+
+        if not self.fetchData():
+            return False
+
+        # results are kept in the order of the urls, pending urls are added in parallel below
+        results = []
+        pending = []
+
+        # build the index of monitored urls once instead of scanning all monitors for each url
+        known_urls = {} if force else repository().lookup(self.monitors, 'url')
+        seen_urls = set()
+
+        for url in urls:
+            # urls do not include the protocol
+            url = url.strip().replace('https://', '').replace('http://', '')
+            if not url:
+                continue
+
+            if url in seen_urls:
+                results.append({'url': url, 'result': 'skipped', 'reason': 'duplicate in file'})
+            elif url in known_urls:
+                results.append({'url': url, 'result': 'skipped', 'reason': 'already exists'})
+            else:
+                pending.append(len(results))
+                results.append({'url': url, 'result': 'failed', 'reason': 'not processed'})
+            seen_urls.add(url)
+
+        def addUrl(url):
+            data = {
+                'url': url,
+                'name': name if name else url,
+                'port': port,
+                'protocol': protocol if protocol else 'https',
+                'keyword': keyword,
+                'match_type': matchType,
+                'monitor': nodeId,
+            }
+
+            # temporary errors like rate limits are already retried by the API layer
+            try:
+                response = apiSend('POST', 'monitors', self.config, data=data)
+            except Exception as e:
+                return {'url': url, 'result': 'failed', 'reason': str(e)}
+
+            if response is None:
+                return {'url': url, 'result': 'skipped', 'reason': 'readonly mode'}
+            elif response.status_code == HTTPStatus.OK.value:
+                return {'url': url, 'result': 'added', 'reason': ''}
+
+            return {'url': url, 'result': 'failed', 'reason': 'status ' + str(response.status_code)}
+
+        def printResult(url, result):
+            if isinstance(result, Exception):
+                print('Failed to add site monitor', url, '(' + str(result) + ')')
+            elif result['result'] == 'added':
+                print('Added site monitor:', url)
+            elif result['result'] == 'failed':
+                print('Failed to add site monitor', url, '(' + result['reason'] + ')')
+
+        # cached responses are invalidated only once after all urls have been added
+        pending_urls = [results[index]['url'] for index in pending]
+        with bulkWrites(self.config):
+            added = runConcurrent(addUrl, pending_urls, self.config.max_workers, printResult)
+
+        for index, result in zip(pending, added):
+            if isinstance(result, Exception):
+                results[index]['reason'] = str(result)
+            else:
+                results[index] = result
+
+        num_added = sum(1 for result in results if result['result'] == 'added')
+        num_skipped = sum(1 for result in results if result['result'] == 'skipped')
+        num_failed = sum(1 for result in results if result['result'] == 'failed')
+
+        print()
+        print('Added:'.ljust(10), num_added)
+        print('Skipped:'.ljust(10), num_skipped)
+        print('Failed:'.ljust(10), num_failed)
+
+        for result in results:
+            if result['result'] != 'added':
+                print('  ' + result['result'] + ':', result['url'], '(' + result['reason'] + ')')
+
+        if resultFile:
+            with open(resultFile, 'w') as file:
+                json.dump(results, file, indent=4)
+            print('Saved result to', resultFile)
+
+        return num_failed == 0
 
-        removed = 0
-        if (id or url or name or location or pattern) and self.fetchData():
+    def remove(self, id: str = '', url: str = '', name: str = '', location: str = '', pattern: str = '', journal: str = '', maxWorkers: int = 0):
+        """Remove the monitors matching the given criteria. Matching monitors are collected in a removal plan first which is then executed in parallel.
+        If a journal file is specified, the plan and each completed removal is recorded so that a rerun only retries removals that did not complete"""
+
+        plan = None
+        done = set()
+
+        if journal and os.path.isfile(journal):
+            plan, done = self.loadJournal(journal)
+            print('Resuming removal of', len(plan) - len(done), 'of', len(plan), 'site monitors from journal', journal)
+        elif (id or url or name or location or pattern) and self.fetchData():
+            plan = []
             for monitor in self.monitors:
-                curr_id = monitor['id']
-                curr_url = monitor['url']
-                curr_name = monitor['name'] if 'name' in monitor else ''
-                curr_location = monitor['monitor']['name']
+                curr_id = monitor.id
+                curr_url = monitor.url
+                curr_name = monitor.name
+                curr_location = monitor.location
 
                 if (id == curr_id) \
                     or (url and url == curr_url) \
                     or (name and name == curr_name) \
                     or (location and location in curr_location) \
                     or (pattern and pattern in curr_url):
-                    removed += 1
-                    apiDelete('monitor/' + curr_id, self.config, successMessage='Removed site monitor: ' + curr_url + ' [' + curr_id + ']', errorMessage='Failed to remove site monitor ' + curr_url + ' [' + curr_id + ']')
+                    plan.append({'id': curr_id, 'url': curr_url})
+
+            if plan and journal:
+                with open(journal, 'w') as file:
+                    file.write(json.dumps({'plan': plan}) + '\n')
 
-        if removed == 0:
+        if not plan:
             printWarn('No monitors with given pattern found: id=' + id, 'url=', url, 'name=' + name, 'location=' + location, 'pattern=' + pattern)
+            return False
+
+        pending = [entry for entry in plan if entry['id'] not in done]
+        progress = {'count': len(plan) - len(pending), 'failed': 0}
+
+        async def removeMonitor(entry):
+            response = await apiSendAsync('DELETE', 'monitor/' + entry['id'], self.config)
+            if response is None:
+                return 'readonly mode'
+
+            # a monitor that does not exist anymore has already been removed
+            if response.status_code in (HTTPStatus.NO_CONTENT.value, HTTPStatus.NOT_FOUND.value):
+                return ''
+            return 'status ' + str(response.status_code)
+
+        def printProgress(entry, error):
+            progress['count'] += 1
+            prefix = '[' + str(progress['count']) + '/' + str(len(plan)) + ']'
+            if isinstance(error, Exception):
+                error = str(error)
+
+            if error:
+                progress['failed'] += 1
+                print(prefix, 'Failed to remove site monitor ' + entry['url'] + ' [' + entry['id'] + '] (' + error + ')')
+            else:
+                print(prefix, 'Removed site monitor: ' + entry['url'] + ' [' + entry['id'] + ']')
+                if journal:
+                    with open(journal, 'a') as file:
+                        file.write(json.dumps({'done': entry['id']}) + '\n')
+
+        if pending and self.config.readonly:
+            printWarn('Readonly mode: no site monitors removed')
+            return False
+
+        # asyncio is only imported when needed to keep the startup time of other commands low
+        from .asyncapi import apiSendAsync, runAsync
+
+        # cached responses are invalidated only once after all monitors have been removed
+        with bulkWrites(self.config):
+            runAsync(removeMonitor, pending, maxWorkers if maxWorkers > 0 else self.config.max_workers, printProgress)
+
+        if progress['failed'] > 0:
+            if journal:
+                printWarn('Failed to remove', progress['failed'], 'site monitors. Run the same command again to retry those listed in journal', journal)
+            else:
+                printWarn('Failed to remove', progress['failed'], 'site monitors')
+            return False
+
+        # all removals are done, journal is not needed anymore
+        if journal and os.path.isfile(journal):
+            os.remove(journal)
 
-    def hasIssue(self, monitor):
+        return True
+
+    def loadJournal(self, journal: str):
+        """Load removal plan and the IDs of completed removals from the specified journal file"""
+
+        plan = []
+        done = set()
+
+        with open(journal) as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # last line might be incomplete if the previous run was interrupted
+                    continue
+
+                if 'plan' in entry:
+                    plan = entry['plan']
+                elif 'done' in entry:
+                    done.add(entry['done'])
+
+        return plan, done
+
+    def hasIssue(self, monitor: MonitorRecord):
         """Return True if the specified monitor has some issue by having a value outside of the expected threshold specified in config file"""
 
-        if float(monitor['uptime_percentage']) <= float(self.config.threshold_uptime):
+        if monitor.uptime_percentage <= self.thresholds.uptime:
             return True
 
-        if 'last_check' in monitor and 'ttfb' in monitor['last_check']:
-            if float(monitor['last_check']['ttfb']) >= float(self.config.threshold_ttfb):
-                return True
+        if monitor.ttfb is not None and monitor.ttfb >= self.thresholds.ttfb:
+            return True
 
         return False
 
@@ -202,8 +400,19 @@ class Sites(object):
         else:
             return None
 
-    def listUptimes(self, siteId: str, periods, dateTimeFormat: str = '%Y-%m-%d'):
-        """Retrieve uptime for the specified site within the specified uptime periods"""
+    def getLocalUptimes(self, siteId: str, periods):
+        """Compute uptime for the specified site within the specified uptime periods from its notification history, which is retrieved only once.
+        Returns the uptime of each period in the same form as getUptime() or None if the notifications could not be retrieved"""
+
+        notifications = SiteNotifications(self.config)
+        if not notifications.fetchData(siteId, min(period[0] for period in periods), max(period[1] for period in periods)):
+            return [None] * len(periods)
+
+        index = DowntimeIndex.fromNotifications(notifications.notifications)
+        return [index.uptime(period[0], period[1]) for period in periods]
+
+    def listUptimes(self, siteId: str, periods, dateTimeFormat: str = '%Y-%m-%d', local: bool = False):
+        """Retrieve uptime for the specified site within the specified uptime periods. With local=True the uptime is computed from the notification history instead"""
 
         table = PrettyTable(field_names=['Uptime in %', 'Period', 'Downtime', 'Events'])
         table.align['Uptime in %'] = 'r'
@@ -211,18 +420,136 @@ class Sites(object):
         table.align['Downtime'] = 'l'
         table.align['Events'] = 'r'
 
-        for period in periods:
-            uptime_json = self.getUptime(siteId, period[0], period[1])
-            if uptime_json:
+        if local:
+            results = self.getLocalUptimes(siteId, periods)
+        else:
+            # retrieve the uptime of all periods in parallel, results are returned in the same order as the periods
+            results = runConcurrent(lambda period: self.getUptime(siteId, period[0], period[1]), periods, self.config.max_workers)
+
+        num_failed = 0
+        for period, uptime_json in zip(periods, results):
+            if uptime_json and not isinstance(uptime_json, Exception):
                 startDate = datetime.fromtimestamp(float(uptime_json['start']))
                 endDate = datetime.fromtimestamp(float(uptime_json['end']))
                 uptime_percentage = float(uptime_json['uptime_percentage'])
                 downtime_seconds = uptime_json['downtime_seconds']
                 events = uptime_json['events']
                 table.add_row(["{:.4f}%".format(uptime_percentage), formatTimespan(startDate, endDate, dateTimeFormat), formatDowntime(downtime_seconds), events])
+            else:
+                # keep a row for the failed period so that no period is silently dropped
+                num_failed += 1
+                startDate = datetime.fromtimestamp(float(period[0]))
+                endDate = datetime.fromtimestamp(float(period[1]))
+                error_text = str(uptime_json) if isinstance(uptime_json, Exception) else 'no data'
+                table.add_row([f"{bcolors.FAIL}failed{bcolors.ENDC}", formatTimespan(startDate, endDate, dateTimeFormat), error_text, ''])
 
         print(table)
 
+        if num_failed > 0:
+            printWarn('Failed to retrieve uptime for', num_failed, 'of', len(periods), 'periods')
+
+    def listAllUptimes(self, periods, dateTimeFormat: str = '%Y-%m-%d', location: str = '', pattern: str = '', local: bool = False, maxWorkers: int = 0):
+        """Retrieve uptime of all sites within the specified uptime periods, optionally only of the sites monitored from the given location or with pattern included in URL.
+        Prints the uptime of each site and period followed by the aggregated uptime of all sites per period"""
+
+        if not self.fetchData():
+            return False
+
+        monitors = [monitor for monitor in self.monitors if (not location or location in monitor.location) and (not pattern or pattern in monitor.url)]
+        if not monitors:
+            printWarn('No monitors with given pattern found: location=' + location, 'pattern=' + pattern)
+            return False
+
+        maxWorkers = maxWorkers if maxWorkers > 0 else self.config.max_workers
+        if local:
+            # the notification history of each site is retrieved once and the uptime of all periods is computed from it
+            results = runConcurrent(lambda monitor: self.getLocalUptimes(monitor.id, periods), monitors, maxWorkers)
+            results = [result if isinstance(result, list) else [result] * len(periods) for result in results]
+        else:
+            # all sites and periods are requested by the same bounded pool, results are returned in the same order as the requests
+            queries = [(monitor, period) for monitor in monitors for period in periods]
+            uptimes = runConcurrent(lambda query: self.getUptime(query[0].id, query[1][0], query[1][1]), queries, maxWorkers)
+            results = [uptimes[index:index + len(periods)] for index in range(0, len(uptimes), len(periods))]
+
+        table = SortableTable(field_names=['ID', 'URL', 'Period', 'Uptime in %', 'Downtime', 'Events'])
+        table.align['ID'] = 'l'
+        table.align['URL'] = 'l'
+        table.align['Period'] = 'l'
+        table.align['Uptime in %'] = 'r'
+        table.align['Downtime'] = 'l'
+        table.align['Events'] = 'r'
+
+        if (self.format == 'csv'):
+            print(self.config.delimiter.join(['ID', 'URL', 'Period', 'Uptime %', 'Downtime seconds', 'Events', 'Error']))
+
+        # sum of uptime percentages, downtime seconds, events, number of sites and number of sites below the uptime threshold per period
+        totals = [[0, 0, 0, 0, 0] for period in periods]
+        num_failed = 0
+
+        for monitor, uptimes in zip(monitors, results):
+            for period, uptime_json, total in zip(periods, uptimes, totals):
+                periodText = formatTimespan(datetime.fromtimestamp(float(period[0])), datetime.fromtimestamp(float(period[1])), dateTimeFormat)
+
+                if not uptime_json or isinstance(uptime_json, Exception):
+                    # keep a row for the failed period so that no site is silently dropped
+                    num_failed += 1
+                    error_text = str(uptime_json) if isinstance(uptime_json, Exception) else 'no data'
+                    if (self.format == 'ndjson'):
+                        printNDJSON({'id': monitor.id, 'url': monitor.url, 'start': period[0], 'end': period[1], 'error': error_text})
+                    elif (self.format == 'csv'):
+                        # the error text must not contain the delimiter to keep the number of columns
+                        print(self.config.delimiter.join([monitor.id, monitor.url, periodText, '', '', '', error_text.replace(self.config.delimiter, ' ')]))
+                    else:
+                        table.addRow([monitor.id, monitor.url, periodText, f"{bcolors.FAIL}failed{bcolors.ENDC}", error_text, ''])
+                    continue
+
+                uptime_percentage = float(uptime_json['uptime_percentage'])
+                downtime_seconds = int(uptime_json['downtime_seconds'])
+                events = int(uptime_json['events'])
+
+                total[0] += uptime_percentage
+                total[1] += downtime_seconds
+                total[2] += events
+                total[3] += 1
+                if uptime_percentage <= self.thresholds.uptime:
+                    total[4] += 1
+
+                if (self.format == 'ndjson'):
+                    printNDJSON({'id': monitor.id, 'url': monitor.url, 'start': period[0], 'end': period[1], 'uptime_percentage': uptime_percentage, 'downtime_seconds': downtime_seconds, 'events': events})
+                elif (self.format == 'csv'):
+                    print(self.config.delimiter.join([monitor.id, monitor.url, periodText, str(uptime_percentage) + '%', str(downtime_seconds), str(events), '']))
+                else:
+                    table.addRow([monitor.id, monitor.url, periodText, self.formatUptime(uptime_percentage), formatDowntime(downtime_seconds), events])
+
+        # aggregated uptime of all sites per period, every site has the same weight
+        for period, (sum_uptime, sum_downtime, sum_events, num_sites, num_below) in zip(periods, totals):
+            periodText = formatTimespan(datetime.fromtimestamp(float(period[0])), datetime.fromtimestamp(float(period[1])), dateTimeFormat)
+            avg_uptime = sum_uptime / num_sites if num_sites > 0 else None
+            sitesText = 'All ' + str(num_sites) + ' sites (' + str(num_below) + ' below ' + str(self.config.threshold_uptime) + '%)'
+
+            if (self.format == 'ndjson'):
+                printNDJSON({'sites': num_sites, 'sites_below_threshold': num_below, 'start': period[0], 'end': period[1], 'uptime_percentage': avg_uptime, 'downtime_seconds': sum_downtime, 'events': sum_events})
+            elif (self.format == 'csv'):
+                print(self.config.delimiter.join(['', sitesText, periodText, str(avg_uptime) + '%' if avg_uptime is not None else '', str(sum_downtime), str(sum_events), '']))
+            else:
+                uptime_text = self.formatUptime(avg_uptime) if avg_uptime is not None else f"{bcolors.FAIL}failed{bcolors.ENDC}"
+                table.addFooter(['', sitesText, periodText, uptime_text, formatDowntime(sum_downtime), sum_events])
+
+        if (self.format == 'table'):
+            print(table.getString(hideColumns=['ID'] if self.config.hide_ids else []))
+
+        if num_failed > 0:
+            printWarn('Failed to retrieve uptime for', num_failed, 'of', len(monitors) * len(periods), 'periods')
+
+        return num_failed == 0
+
+    def formatUptime(self, uptime_percentage: float):
+        """Return uptime in percent, colored if it is below the expected threshold"""
+        if uptime_percentage <= self.thresholds.uptime:
+            return f"{bcolors.FAIL}" + "{:.4f}%".format(uptime_percentage) + f"{bcolors.ENDC}"
+        else:
+            return "{:.4f}%".format(uptime_percentage)
+
     def printHeader(self):
         """Print CSV header if CSV format requested"""
         if (self.format == 'csv'):
@@ -235,73 +562,46 @@ class Sites(object):
             avg_uptime = self.sum_uptime / self.num_monitors if self.sum_uptime > 0 and self.num_monitors > 0 else 0
             avg_ttfb = self.sum_ttfb / self.num_monitors if self.sum_ttfb > 0 and self.num_monitors > 0 else 0
 
-            if avg_uptime <= float(self.config.threshold_uptime):
+            if avg_uptime <= self.thresholds.uptime:
                 uptime_percentage_text = f"{bcolors.FAIL}" + "{:.4f}".format(avg_uptime) + f"{bcolors.ENDC}"
             else:
                 uptime_percentage_text = "{:.4f}".format(avg_uptime)
 
-            if avg_ttfb >= float(self.config.threshold_ttfb):
+            if avg_ttfb >= self.thresholds.ttfb:
                 ttfb_text = f"{bcolors.FAIL}" + "{:.2f}".format(avg_ttfb) + f"{bcolors.ENDC}"
             else:
                 ttfb_text = "{:.2f}".format(avg_ttfb)
 
             # add average row as table footer
-            self.table.add_row(['', 'Average of ' + str(self.num_monitors) + ' monitors', '', uptime_percentage_text, ttfb_text, ''])
-
-            # remove columns that should be excluded
-            if self.config.hide_ids:
-                self.table.del_column('ID')
-
-            # Get string to be printed and create list of elements separated by \n
-            list_of_table_lines = self.table.get_string().split('\n')
-
-            # remember summary row
-            summary_line = list_of_table_lines[-2]
-
-            # remove summary row again to allow sorting and limiting
-            self.table.del_row(len(self.table.rows)-1)
+            self.table.setFooter(['', 'Average of ' + str(self.num_monitors) + ' monitors', '', uptime_percentage_text, ttfb_text, ''])
 
-            if sort:
-                # if sort contains the column index instead of the column name, get the column name instead
-                if sort.isdecimal():
-                    sort = self.table.get_csv_string().split(',')[int(sort) - 1]
-            else:
-                sort = None
-
-            if limit > 0:
-                list_of_table_lines = self.table.get_string(sortby=sort, reversesort=reverse, start=0, end=limit).split('\n')
-            else:
-                list_of_table_lines = self.table.get_string(sortby=sort, reversesort=reverse).split('\n')
-
-            # Sorting by multiple columns could be done like this
-            # list_of_table_lines = self.table.get_string(sortby=("Col Name 1", "Col Name 2")), reversesort=reverse).split('\n')
-
-            # Print the table
-            print('\n'.join(list_of_table_lines))
-            print(summary_line)
-            print(list_of_table_lines[0])
+            print(self.table.getString(sort=sort, reverse=reverse, limit=limit, hideColumns=['ID'] if self.config.hide_ids else []))
 
         # elif (self.format == 'csv'):
         #    print(self.table.get_csv_string(delimiter=self.config.delimiter))
 
-    def print(self, monitor):
+    def print(self, monitor: MonitorRecord):
         """Print the data of the specified web monitor"""
 
         if (self.format == 'json'):
-            print(json.dumps(monitor, indent=4))
+            print(json.dumps(monitor.raw, indent=4))
+            return
+        elif (self.format == 'ndjson'):
+            # raw JSON is already kept in compact form
+            print(monitor.raw_json.decode('utf-8'))
             return
 
-        id = monitor['id']
-        url = monitor['url']
-        name = monitor['name'] if 'name' in monitor else ''
-        code = monitor['code'] if 'code' in monitor else ''
-        status = monitor['status'] if 'status' in monitor else ''
-        status_message = monitor['status_message'] if 'status_message' in monitor else ''
-        location = monitor['monitor']['name']
-        uptime_percentage = float(monitor['uptime_percentage'])
-
-        if 'last_check' in monitor and 'ttfb' in monitor['last_check']:
-            ttfb = float(monitor['last_check']['ttfb'])
+        id = monitor.id
+        url = monitor.url
+        name = monitor.name
+        code = monitor.code
+        status = monitor.status
+        status_message = monitor.status_message
+        location = monitor.location
+        uptime_percentage = monitor.uptime_percentage
+
+        if monitor.ttfb is not None:
+            ttfb = monitor.ttfb
             self.sum_uptime = self.sum_uptime + uptime_percentage
             self.sum_ttfb = self.sum_ttfb + ttfb
             self.num_monitors = self.num_monitors + 1
@@ -311,16 +611,17 @@ class Sites(object):
         if (self.format == 'csv'):
             print(self.config.delimiter.join([id, url, name, str(code), status, status_message, str(uptime_percentage) + '%', str(ttfb), location]))
         else:
-            if uptime_percentage <= float(self.config.threshold_uptime):
+            if uptime_percentage <= self.thresholds.uptime:
                 uptime_percentage_text = f"{bcolors.FAIL}" + "{:.4f}".format(uptime_percentage) + f"{bcolors.ENDC}"
             else:
                 uptime_percentage_text = "{:.4f}".format(uptime_percentage)
 
-            if ttfb >= float(self.config.threshold_ttfb):
+            if ttfb >= self.thresholds.ttfb:
                 ttfb_text = f"{bcolors.FAIL}" + "{:.2f}".format(ttfb) + f"{bcolors.ENDC}"
             elif ttfb != -1:
                 ttfb_text = "{:.2f}".format(ttfb)
             else:
                 ttfb_text = f"{bcolors.FAIL}n/a{bcolors.ENDC}"
 
-            self.table.add_row([id, url, status_message, uptime_percentage_text, ttfb_text, location])
+            self.table.addRow([id, url, status_message, uptime_percentage_text, ttfb_text, location],
+                              [id, url, status_message, uptime_percentage, ttfb if ttfb != -1 else None, location])
@@ -7,96 +7,125 @@ from .servers import Servers
 from .sites import Sites
 from .contacts import Contacts
 from .usertokens import UserTokens
+from .workers import runConcurrent
+from .functions import printError
 from .bcolors import bcolors
+from .rules import Thresholds
 
 class Statistics(object):
 
     def __init__(self, config: Config):
         self.config = config
+        self.thresholds = Thresholds(config)
 
         self.table = PrettyTable(field_names=['Value', 'Metric'])
         self.table.align['Value'] = 'r'
         self.table.align['Metric'] = 'l'
 
     def print(self, format: str = 'table'):
-        """Iterate through all assets and print statistics"""
+        """Fetch all assets in parallel and print statistics"""
 
         servers = Servers(self.config)
-        if servers.fetchData():
-            sum_cpu_usage = 0
-            sum_mem_usage = 0
-            sum_disk_usage = 0
-            num_servers = len(servers.servers)
-            self.table.add_row([len(servers.servers), 'Servers'])
-
-            for server in servers.servers:
-                sum_cpu_usage = sum_cpu_usage + server['summary']['cpu_usage_percent'] if 'summary' in server else 0
-                sum_mem_usage = sum_mem_usage + server['summary']['mem_usage_percent'] if 'summary' in server else 0
-                sum_disk_usage = sum_disk_usage + server['summary']['disk_usage_percent'] if 'summary' in server else 0
-
-            avg_cpu_usage = sum_cpu_usage / num_servers if sum_cpu_usage > 0 and num_servers > 0 else 0
-            avg_mem_usage = sum_mem_usage / num_servers if sum_mem_usage > 0 and num_servers > 0 else 0
-            avg_disk_usage = sum_disk_usage / num_servers if sum_disk_usage > 0 and num_servers > 0 else 0
-
-            if avg_cpu_usage >= float(self.config.threshold_cpu_usage):
-                avg_cpu_usage_text = f"{bcolors.FAIL}" + "{:.1f}".format(avg_cpu_usage) + f"{bcolors.ENDC}"
-            else:
-               avg_cpu_usage_text = "{:.1f}".format(avg_cpu_usage)
-
-            if avg_mem_usage >= float(self.config.threshold_mem_usage):
-                avg_mem_usage_text = f"{bcolors.FAIL}" + "{:.1f}".format(avg_mem_usage) + f"{bcolors.ENDC}"
-            else:
-               avg_mem_usage_text = "{:.1f}".format(avg_mem_usage)
-
-            if avg_disk_usage >= float(self.config.threshold_disk_usage):
-                avg_disk_usage_text = f"{bcolors.FAIL}" + "{:.1f}".format(avg_disk_usage) + f"{bcolors.ENDC}"
-            else:
-               avg_disk_usage_text = "{:.1f}".format(avg_disk_usage)
-
-            self.table.add_row([avg_cpu_usage_text, '% avg cpu usage of all ' + str(num_servers) + ' servers'])
-            self.table.add_row([avg_mem_usage_text, '% avg mem usage of all ' + str(num_servers) + ' servers'])
-            self.table.add_row([avg_disk_usage_text, '% avg disk usage of all ' + str(num_servers) + ' servers'])
-
         sites = Sites(self.config)
-        if sites.fetchData():
-            sum_uptime = 0
-            sum_ttfb = 0
-            num_monitors = len(sites.monitors)
-            self.table.add_row([len(sites.monitors), 'Sites'])
-
-            for monitor in sites.monitors:
-                uptime_percentage = float(monitor['uptime_percentage'])
-
-                if 'last_check' in monitor and 'ttfb' in monitor['last_check']:
-                    ttfb = float(monitor['last_check']['ttfb'])
-                    sum_uptime = sum_uptime + uptime_percentage
-                    sum_ttfb = sum_ttfb + ttfb
-
-            avg_uptime = sum_uptime / num_monitors if sum_uptime > 0 and num_monitors > 0 else 0
-            avg_ttfb = sum_ttfb / num_monitors if sum_ttfb > 0 and num_monitors > 0 else 0
-
-            if avg_uptime <= float(self.config.threshold_uptime):
-                uptime_percentage_text = f"{bcolors.FAIL}" + "{:.4f}".format(avg_uptime) + f"{bcolors.ENDC}"
-            else:
-                uptime_percentage_text = "{:.4f}".format(avg_uptime)
+        contacts = Contacts(self.config)
+        usertokens = UserTokens(self.config)
 
-            if avg_ttfb >= float(self.config.threshold_ttfb):
-                ttfb_text = f"{bcolors.FAIL}" + "{:.2f}".format(avg_ttfb) + f"{bcolors.ENDC}"
-            else:
-                ttfb_text = "{:.2f}".format(avg_ttfb)
+        # all collections are fetched at the same time via the shared HTTP session and each one is aggregated as soon as it arrives
+        aggregators = {
+            servers: self.serverRows,
+            sites: self.siteRows,
+            contacts: lambda contacts: [[len(contacts.contacts), 'Contacts']],
+            usertokens: lambda usertokens: [[len(usertokens.usertokens), 'User Tokens']],
+        }
+        rows = {}
 
-            self.table.add_row([uptime_percentage_text, '% avg uptime of all ' + str(num_monitors) + ' sites'])
-            self.table.add_row([ttfb_text, 'sec avg ttfb of all ' + str(num_monitors) + ' sites'])
+        def aggregate(collection, result):
+            if isinstance(result, Exception):
+                printError('Failed to fetch data:', result)
+            elif result:
+                rows[collection] = aggregators[collection](collection)
 
-        contacts = Contacts(self.config)
-        if contacts.fetchData():
-            self.table.add_row([len(contacts.contacts), 'Contacts'])
+        runConcurrent(lambda collection: collection.fetchData(), aggregators.keys(), len(aggregators), callback=aggregate)
 
-        usertokens = UserTokens(self.config)
-        if usertokens.fetchData():
-            self.table.add_row([len(usertokens.usertokens), 'User Tokens'])
+        # keep the order of the rows independent of which collection arrived first
+        for collection in aggregators:
+            for row in rows.get(collection, []):
+                self.table.add_row(row)
 
         if (format == 'table'):
             print(self.table)
         elif (format == 'csv'):
             print(self.table.get_csv_string(delimiter=self.config.delimiter))
+
+    def serverRows(self, servers: Servers):
+        """Return statistics rows of all servers"""
+
+        rows = []
+        sum_cpu_usage = 0
+        sum_mem_usage = 0
+        sum_disk_usage = 0
+        num_servers = len(servers.servers)
+        rows.append([len(servers.servers), 'Servers'])
+
+        for server in servers.servers:
+            sum_cpu_usage = sum_cpu_usage + server.cpu_usage_percent if server.has_summary else 0
+            sum_mem_usage = sum_mem_usage + server.mem_usage_percent if server.has_summary else 0
+            sum_disk_usage = sum_disk_usage + server.disk_usage_percent if server.has_summary else 0
+
+        avg_cpu_usage = sum_cpu_usage / num_servers if sum_cpu_usage > 0 and num_servers > 0 else 0
+        avg_mem_usage = sum_mem_usage / num_servers if sum_mem_usage > 0 and num_servers > 0 else 0
+        avg_disk_usage = sum_disk_usage / num_servers if sum_disk_usage > 0 and num_servers > 0 else 0
+
+        if avg_cpu_usage >= self.thresholds.cpu_usage:
+            avg_cpu_usage_text = f"{bcolors.FAIL}" + "{:.1f}".format(avg_cpu_usage) + f"{bcolors.ENDC}"
+        else:
+           avg_cpu_usage_text = "{:.1f}".format(avg_cpu_usage)
+
+        if avg_mem_usage >= self.thresholds.mem_usage:
+            avg_mem_usage_text = f"{bcolors.FAIL}" + "{:.1f}".format(avg_mem_usage) + f"{bcolors.ENDC}"
+        else:
+           avg_mem_usage_text = "{:.1f}".format(avg_mem_usage)
+
+        if avg_disk_usage >= self.thresholds.disk_usage:
+            avg_disk_usage_text = f"{bcolors.FAIL}" + "{:.1f}".format(avg_disk_usage) + f"{bcolors.ENDC}"
+        else:
+           avg_disk_usage_text = "{:.1f}".format(avg_disk_usage)
+
+        rows.append([avg_cpu_usage_text, '% avg cpu usage of all ' + str(num_servers) + ' servers'])
+        rows.append([avg_mem_usage_text, '% avg mem usage of all ' + str(num_servers) + ' servers'])
+        rows.append([avg_disk_usage_text, '% avg disk usage of all ' + str(num_servers) + ' servers'])
+
+        # same evaluation as for "servers list --issues" and "recommendations"
+        rows.append([len(servers.issues()), 'Servers with issues'])
+        return rows
+
+    def siteRows(self, sites: Sites):
+        """Return statistics rows of all sites"""
+
+        rows = []
+        sum_uptime = 0
+        sum_ttfb = 0
+        num_monitors = len(sites.monitors)
+        rows.append([len(sites.monitors), 'Sites'])
+
+        for monitor in sites.monitors:
+            if monitor.ttfb is not None:
+                sum_uptime = sum_uptime + monitor.uptime_percentage
+                sum_ttfb = sum_ttfb + monitor.ttfb
+
+        avg_uptime = sum_uptime / num_monitors if sum_uptime > 0 and num_monitors > 0 else 0
+        avg_ttfb = sum_ttfb / num_monitors if sum_ttfb > 0 and num_monitors > 0 else 0
+
+        if avg_uptime <= self.thresholds.uptime:
+            uptime_percentage_text = f"{bcolors.FAIL}" + "{:.4f}".format(avg_uptime) + f"{bcolors.ENDC}"
+        else:
+            uptime_percentage_text = "{:.4f}".format(avg_uptime)
+
+        if avg_ttfb >= self.thresholds.ttfb:
+            ttfb_text = f"{bcolors.FAIL}" + "{:.2f}".format(avg_ttfb) + f"{bcolors.ENDC}"
+        else:
+            ttfb_text = "{:.2f}".format(avg_ttfb)
+
+        rows.append([uptime_percentage_text, '% avg uptime of all ' + str(num_monitors) + ' sites'])
+        rows.append([ttfb_text, 'sec avg ttfb of all ' + str(num_monitors) + ' sites'])
+        return rows
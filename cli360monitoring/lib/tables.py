@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import heapq
+from prettytable import PrettyTable
+
+from .functions import printWarn
+
+class SortableTable(object):
+    """ASCII table that keeps the raw value of each cell to sort on, and renders the table together with optional footer rows exactly once"""
+
+    def __init__(self, field_names):
+        self.table = PrettyTable(field_names=field_names)
+        self.rows = []
+        self.footers = []
+
+    @property
+    def field_names(self):
+        return self.table.field_names
+
+    @property
+    def align(self):
+        return self.table.align
+
+    @property
+    def min_width(self):
+        return self.table.min_width
+
+    def addRow(self, cells, values = None):
+        """Add a row of formatted cells. Values are the raw (e.g. numeric) values of the cells used for sorting, by default the cells themselves"""
+        self.rows.append((values if values is not None else cells, cells))
+
+    def setFooter(self, cells):
+        """Set a footer row that is always printed below all other rows, e.g. to show sums or averages"""
+        self.footers = [cells]
+
+    def addFooter(self, cells):
+        """Add another footer row below the existing ones"""
+        self.footers.append(cells)
+
+    def sortIndex(self, sort: str, fieldNames):
+        """Return the index of the column to sort by. Sort can be the column name or the column number starting with 1"""
+
+        if not sort:
+            return None
+
+        # if sort contains the column index instead of the column name, get the column name instead
+        if sort.isdecimal():
+            if 0 < int(sort) <= len(fieldNames):
+                sort = fieldNames[int(sort) - 1]
+            else:
+                printWarn('Invalid column number to sort by:', sort)
+                return None
+
+        if sort not in fieldNames:
+            printWarn('Invalid column to sort by:', sort)
+            return None
+
+        return self.table.field_names.index(sort)
+
+    def sortedRows(self, sort: str = '', reverse: bool = False, limit: int = 0, hideColumns = []):
+        """Return rows sorted by the raw values of the specified column and limited to the specified number of rows. Rows without value are always last"""
+
+        fieldNames = [name for name in self.table.field_names if name not in hideColumns]
+        index = self.sortIndex(sort, fieldNames)
+
+        rows = self.rows
+        if index is not None:
+            filled = [row for row in rows if not isEmpty(row[0][index])]
+            empty = [row for row in rows if isEmpty(row[0][index])]
+            key = lambda row: sortKey(row[0][index])
+
+            if limit > 0 and limit < len(filled):
+                # select only the top k rows instead of sorting all of them
+                if reverse:
+                    rows = heapq.nlargest(limit, filled, key=key)
+                else:
+                    rows = heapq.nsmallest(limit, filled, key=key)
+            else:
+                rows = sorted(filled, key=key, reverse=reverse) + empty
+
+        if limit > 0:
+            rows = rows[:limit]
+
+        return rows
+
+    def getString(self, sort: str = '', reverse: bool = False, limit: int = 0, hideColumns = []):
+        """Return the rendered table"""
+
+        rows = self.sortedRows(sort, reverse, limit, hideColumns)
+
+        visible = [index for index, name in enumerate(self.table.field_names) if name not in hideColumns]
+        for column in hideColumns:
+            if column in self.table.field_names:
+                self.table.del_column(column)
+
+        self.table.clear_rows()
+        for values, cells in rows:
+            self.table.add_row([cells[index] for index in visible])
+
+        if not self.footers:
+            return self.table.get_string()
+
+        # render the footers as part of the table so that they get the same column widths, then print them below a separator line
+        for footer in self.footers:
+            self.table.add_row([footer[index] for index in visible])
+        lines = self.table.get_string().split('\n')
+        count = len(self.footers) + 1
+        return '\n'.join(lines[:-count] + [lines[-1]] + lines[-count:-1] + [lines[0]])
+
+    def getCsvString(self, delimiter: str = ','):
+        """Return all rows as CSV without footer"""
+
+        table = PrettyTable(field_names=self.table.field_names)
+        for values, cells in self.rows:
+            table.add_row(cells)
+        return table.get_csv_string(delimiter=delimiter)
+
+def isEmpty(value):
+    """Return True if value should not be taken into account for sorting"""
+    return value is None or value == ''
+
+def sortKey(value):
+    """Return key to sort values of different types: numbers first, then text"""
+    if isinstance(value, (int, float)):
+        return (0, value, '')
+    else:
+        return (1, 0, str(value))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+def buildTagIndex(items):
+    """Return dict of tag to set of positions of all items having this tag"""
+
+    index = {}
+    for position, item in enumerate(items):
+        for tag in item.get('tags') or []:
+            index.setdefault(tag, set()).add(position)
+    return index
+
+def matchTags(index: dict, count: int, expressions):
+    """Return sorted positions of all items matching all tag expressions. Each expression is a tag, "a|b" for items having tag a or b, or "!a" for items without tag a"""
+
+    result = None
+    for expression in expressions:
+        matches = set()
+        for tag in expression.split('|'):
+            if tag.startswith('!'):
+                matches |= set(range(count)) - index.get(tag[1:], set())
+            else:
+                matches |= index.get(tag, set())
+
+        result = matches if result is None else result & matches
+        if not result:
+            break
+
+    return sorted(result) if result is not None else list(range(count))
+
+def hasTags(tags, expressions):
+    """Return True if the specified list of tags of a single item matches all tag expressions, same as matchTags does for an index"""
+
+    for expression in expressions:
+        if not any((tag[1:] not in tags) if tag.startswith('!') else (tag in tags) for tag in expression.split('|')):
+            return False
+    return True
+
+def plainTags(expressions):
+    """Return the tags of all expressions that are a single tag without OR or NOT, i.e. which the API can filter by itself"""
+    return [expression for expression in expressions if expression and '|' not in expression and not expression.startswith('!')]
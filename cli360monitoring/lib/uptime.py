@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import time
+from bisect import bisect_left, bisect_right
+
+class DowntimeIndex(object):
+    """Sorted and merged downtime intervals of a site with prefix sums of their durations,
+    so that uptime, downtime and events of any period are computed locally in O(log n)"""
+
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+
+        # merge overlapping intervals, e.g. if several notifications were sent for the same outage
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+        # durations[i] is the sum of the durations of the first i intervals
+        self.durations = [0]
+        for start, end in zip(self.starts, self.ends):
+            self.durations.append(self.durations[-1] + end - start)
+
+    @classmethod
+    def fromNotifications(cls, notifications):
+        """Return index of the outages of the specified site notifications. Outages without end are ongoing"""
+
+        now = time.time()
+        intervals = []
+        for notification in notifications:
+            start = float(notification['start'])
+            end = float(notification['end']) if notification.get('end') else 0
+            intervals.append((start, end if end > start else now))
+
+        return cls(intervals)
+
+    def overlapping(self, start: float, end: float):
+        """Return range of the positions of all intervals overlapping the specified period"""
+
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        return range(first, max(first, last))
+
+    def downtime(self, start: float, end: float):
+        """Return downtime in seconds within the specified period"""
+
+        positions = self.overlapping(start, end)
+        if not positions:
+            return 0
+
+        first = positions[0]
+        last = positions[-1]
+        seconds = self.durations[last + 1] - self.durations[first]
+
+        # only count the parts of the first and last interval within the period
+        seconds -= max(0, start - self.starts[first])
+        seconds -= max(0, self.ends[last] - end)
+        return seconds
+
+    def events(self, start: float, end: float):
+        """Return number of outages within the specified period"""
+        return len(self.overlapping(start, end))
+
+    def uptime(self, start: float, end: float):
+        """Return uptime of the specified period in the same form as the uptime API endpoint"""
+
+        downtime_seconds = self.downtime(start, end)
+        duration = end - start
+        uptime_percentage = 100 * (1 - downtime_seconds / duration) if duration > 0 else 100
+
+        return {
+            'start': start,
+            'end': end,
+            'uptime_percentage': uptime_percentage,
+            'downtime_seconds': int(round(downtime_seconds)),
+            'events': self.events(start, end),
+        }
@@ -4,9 +4,10 @@ import json
 from http import HTTPStatus
 from prettytable import PrettyTable
 
-from .api import apiGet, apiPost
+from .api import apiPost
+from .repository import repository
 from .config import Config
-from .functions import printError, printWarn
+from .functions import printError, printWarn, printNDJSON
 
 class UserTokens(object):
 
@@ -26,7 +27,7 @@ class UserTokens(object):
         if self.usertokens != None:
             return True
 
-        response_json = apiGet('usertoken', self.config)
+        response_json = repository().get('usertoken', self.config)
         if response_json:
             if 'tokens' in response_json:
                 self.usertokens = response_json['tokens']
@@ -53,10 +54,10 @@ class UserTokens(object):
                 for usertoken in self.usertokens:
                     if token:
                         if usertoken['token'] == token:
-                            self.print(usertoken)
+                            self.print(usertoken, format)
                             break
                     else:
-                        self.print(usertoken)
+                        self.print(usertoken, format)
 
             if (format == 'table'):
                 print(self.table)
@@ -85,6 +86,9 @@ class UserTokens(object):
         if (format == 'json'):
             print(json.dumps(usertoken, indent=4))
             return
+        elif (format == 'ndjson'):
+            printNDJSON(usertoken)
+            return
 
         token = usertoken['token']
         name = usertoken['name'] if 'name' in usertoken and usertoken['name'] else ''
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+from datetime import datetime
+
+from .config import Config
+
+PYPI_URL = 'https://pypi.org/pypi/360monitoringcli/json'
+
+def versionTuple(version: str):
+    """Return version string like "1.0.19" as tuple of numbers to compare versions correctly"""
+    numbers = []
+    for part in version.split('.'):
+        digits = ''.join(c for c in part if c.isdigit())
+        numbers.append(int(digits) if digits else 0)
+    return tuple(numbers)
+
+def isNewerVersion(version: str, currentVersion: str):
+    """Return True if version is newer than currentVersion"""
+    return bool(version) and versionTuple(version) > versionTuple(currentVersion)
+
+def fetchLatestVersion(timeout: float = 10):
+    """Return the latest version of the CLI published on PyPi or empty string if it cannot be determined"""
+    import json
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(PYPI_URL, timeout=timeout) as response:
+            return json.load(response)['info']['version']
+    except Exception:
+        return ''
+
+def startVersionCheck():
+    """Start a detached background process that stores the latest version in the config file, so the next command can print it without waiting"""
+
+    import subprocess
+
+    command = [sys.executable, '-m', 'cli360monitoring.lib.versioncheck']
+    kwargs = {
+        'stdin': subprocess.DEVNULL,
+        'stdout': subprocess.DEVNULL,
+        'stderr': subprocess.DEVNULL,
+        'close_fds': True,
+    }
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+
+    try:
+        subprocess.Popen(command, **kwargs)
+    except OSError:
+        pass
+
+def main():
+    """Entry point of the background process: fetch latest version from PyPi and save it to the config file"""
+    latest_version = fetchLatestVersion()
+    if latest_version:
+        # reload config right before saving to keep changes done in the meantime
+        cfg = Config('')
+        cfg.latest_version = latest_version
+        cfg.last_version_check = datetime.now().isoformat()
+        cfg.saveToFile(False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def runConcurrent(func, items, maxWorkers: int = 8, callback = None):
+    """Call func for each item with at most maxWorkers parallel threads and return the results in the same order as items.
+    If a call raises an exception, the exception is returned as result for this item instead.
+    The optional callback(item, result) is called in the calling thread as soon as a result is available."""
+
+    items = list(items)
+    results = [None] * len(items)
+
+    if not items:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(int(maxWorkers), len(items)))) as executor:
+        futures = {executor.submit(func, item): index for index, item in enumerate(items)}
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = e
+
+            if callback:
+                callback(items[index], results[index])
+
+    return results
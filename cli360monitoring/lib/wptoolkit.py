@@ -1,16 +1,15 @@
 #!/usr/bin/env python3
 
-from prettytable import PrettyTable
-
 from .config import Config
 from .servers import Servers
+from .tables import SortableTable
 
 class WPToolkit(object):
 
     def __init__(self, config: Config):
         self.config = config
 
-        self.table = PrettyTable(field_names=['ID', 'Server name', 'WP sites', 'Alive', 'Outdated', 'Outdated PHP', 'Broken'])
+        self.table = SortableTable(field_names=['ID', 'Server name', 'WP sites', 'Alive', 'Outdated', 'Outdated PHP', 'Broken'])
         self.table.align['ID'] = 'l'
         self.table.align['Server name'] = 'l'
         self.table.min_width['Server name'] = 24
@@ -31,39 +30,9 @@ class WPToolkit(object):
         """Print table if table format requested"""
 
         # add summary row as table footer
-        self.table.add_row(['', 'Sum of ' + str(self.num_servers_with_wpt) + ' servers', self.sum_wp_sites_total, self.sum_wp_sites_alive, self.sum_wp_sites_outdated, self.sum_wp_sites_outdated_php, self.sum_wp_sites_broken])
-
-        if self.config.hide_ids:
-            self.table.del_column('ID')
-
-        # Get string to be printed and create list of elements separated by \n
-        list_of_table_lines = self.table.get_string().split('\n')
-
-        # remember summary row
-        summary_line = list_of_table_lines[-2]
-
-        # remove summary row again to allow sorting and limiting
-        self.table.del_row(len(self.table.rows)-1)
+        self.table.setFooter(['', 'Sum of ' + str(self.num_servers_with_wpt) + ' servers', self.sum_wp_sites_total, self.sum_wp_sites_alive, self.sum_wp_sites_outdated, self.sum_wp_sites_outdated_php, self.sum_wp_sites_broken])
 
-        if sort:
-            # if sort contains the column index instead of the column name, get the column name instead
-            if sort.isdecimal():
-                sort = self.table.get_csv_string().split(',')[int(sort) - 1]
-        else:
-            sort = None
-
-        if limit > 0:
-            list_of_table_lines = self.table.get_string(sortby=sort, reversesort=reverse, start=0, end=limit).split('\n')
-        else:
-            list_of_table_lines = self.table.get_string(sortby=sort, reversesort=reverse).split('\n')
-
-        # Sorting by multiple columns could be done like this
-        # list_of_table_lines = self.table.get_string(sortby=("Col Name 1", "Col Name 2")), reversesort=reverse).split('\n')
-
-        # Print the table
-        print('\n'.join(list_of_table_lines))
-        print(summary_line)
-        print(list_of_table_lines[0])
+        print(self.table.getString(sort=sort, reverse=reverse, limit=limit, hideColumns=['ID'] if self.config.hide_ids else []))
 
     def print(self, format: str = 'table', issuesOnly: bool = False, sort: str = '', reverse: bool = False, limit: int = 0):
         """Iterate through all servers and aggregate metrics for those that have WP Toolkit installed"""
@@ -71,29 +40,27 @@ class WPToolkit(object):
         servers = Servers(self.config)
         if servers.fetchData():
             for server in servers.servers:
-                id = server['id']
-                name = server['name']
-                last_data = server['last_data']
-                if last_data and 'wp-toolkit' in last_data:
-                    wpt_data = last_data['wp-toolkit']
-                    if wpt_data:
-                        wp_sites_total = wpt_data['WordPress Websites']
-                        wp_sites_alive = wpt_data['WordPress Websites - Alive']
-                        wp_sites_outdated = wpt_data['WordPress Websites - Outdated']
-                        wp_sites_outdated_php = wpt_data['WordPress Websites - Outdated PHP']
-                        wp_sites_broken = wpt_data['WordPress Websites - Broken']
-
-                        self.num_servers_with_wpt += 1
-                        self.sum_wp_sites_total += wp_sites_total
-                        self.sum_wp_sites_alive += wp_sites_alive
-                        self.sum_wp_sites_outdated += wp_sites_outdated
-                        self.sum_wp_sites_outdated_php += wp_sites_outdated_php
-                        self.sum_wp_sites_broken += wp_sites_broken
-
-                        if wp_sites_outdated > 0 or wp_sites_outdated_php > 0 or wp_sites_broken > 0 or not issuesOnly:
-                            self.table.add_row([id, name, wp_sites_total, wp_sites_alive, wp_sites_outdated, wp_sites_outdated_php, wp_sites_broken])
+                id = server.id
+                name = server.name
+                wpt_data = server.wp_toolkit
+                if wpt_data:
+                    wp_sites_total = wpt_data['WordPress Websites']
+                    wp_sites_alive = wpt_data['WordPress Websites - Alive']
+                    wp_sites_outdated = wpt_data['WordPress Websites - Outdated']
+                    wp_sites_outdated_php = wpt_data['WordPress Websites - Outdated PHP']
+                    wp_sites_broken = wpt_data['WordPress Websites - Broken']
+
+                    self.num_servers_with_wpt += 1
+                    self.sum_wp_sites_total += wp_sites_total
+                    self.sum_wp_sites_alive += wp_sites_alive
+                    self.sum_wp_sites_outdated += wp_sites_outdated
+                    self.sum_wp_sites_outdated_php += wp_sites_outdated_php
+                    self.sum_wp_sites_broken += wp_sites_broken
+
+                    if wp_sites_outdated > 0 or wp_sites_outdated_php > 0 or wp_sites_broken > 0 or not issuesOnly:
+                        self.table.addRow([id, name, wp_sites_total, wp_sites_alive, wp_sites_outdated, wp_sites_outdated_php, wp_sites_broken])
 
         if (format == 'table'):
             self.printFooter(sort=sort, reverse=reverse, limit=limit)
         elif (format == 'csv'):
-            print(self.table.get_csv_string(delimiter=self.config.delimiter))
+            print(self.table.getCsvString(delimiter=self.config.delimiter))
@@ -2,30 +2,14 @@
 
 import os
 import argparse
-import json
-import subprocess
 import sys
-import webbrowser
 
 from datetime import datetime, timedelta
 
 # suprisingly this works in PyPi, but not locally. For local usage replace ".lib." with "lib."
 # use "pip install -e ." to use "360monitoring" command with latest dev build locally based on local code.
 from .lib.config import Config
-from .lib.contacts import Contacts
-from .lib.incidents import Incidents
-from .lib.magiclinks import MagicLinks
-from .lib.nodes import Nodes
-from .lib.recommendations import Recommendations
-from .lib.servers import Servers
-from .lib.servercharts import ServerCharts
-from .lib.servernotifications import ServerNotifications
-from .lib.sites import Sites
-from .lib.sitecharts import SiteCharts
-from .lib.sitenotifications import SiteNotifications
-from .lib.statistics import Statistics
-from .lib.usertokens import UserTokens
-from .lib.wptoolkit import WPToolkit
+from .lib.versioncheck import isNewerVersion
 
 __version__ = '1.0.19'
 
@@ -33,29 +17,35 @@ __version__ = '1.0.19'
 if sys.version_info[0] < 3:
     raise Exception("360 Monitoring CLI requires Python 3.x")
 
-cfg = Config(__version__)
+# config is loaded in main() to keep importing this module cheap
+cfg = None
 cli = argparse.ArgumentParser(prog='360monitoring', description='CLI for 360 Monitoring')
 cli_subcommands = dict()
 
 def check_version():
-    """Check PyPi if there is a newer version of the application, but only once every 24 hours"""
+    """Print a hint to stderr if a newer version of the application is known and check PyPi for it in the background, but only once every 24 hours"""
+
+    # version check can be disabled in config file, e.g. for automation hosts
+    if not cfg.version_check:
+        return
 
     # some code parts have been introduced in Python 3.7 and are not supported on older versions
     if sys.version_info >= (3, 7):
 
-        # skip version check if the last one was within 24 hours already
+        # skip version check and hint if the last one was within 24 hours already
         if cfg.last_version_check and datetime.fromisoformat(cfg.last_version_check) > (datetime.now() - timedelta(hours=24)):
             return
 
-        latest_version = str(subprocess.run([sys.executable, '-m', 'pip', 'install', '360monitoringcli==random'], capture_output=True, text=True))
-        latest_version = latest_version[latest_version.find('(from versions:')+15:]
-        latest_version = latest_version[:latest_version.find(')')]
-        latest_version = latest_version.replace(' ','').split(',')[-1]
+        # only use the result of the last check here to never delay the actual command and print it to stderr to keep the output parseable
+        if isNewerVersion(cfg.latest_version, __version__):
+            print('Update available: Please upgrade from', __version__, 'to', cfg.latest_version, 'with: pip install 360monitoringcli --upgrade', file=sys.stderr)
+
+        # remember the check right away so that following commands do not start another one
         cfg.last_version_check = datetime.now().isoformat()
         cfg.saveToFile(False)
 
-        if latest_version > __version__:
-            print('Update available: Please upgrade from', __version__, 'to', latest_version, 'with: pip install 360monitoringcli --upgrade')
+        from .lib.versioncheck import startVersionCheck
+        startVersionCheck()
 
 def check_columns(columns):
     """Show or hide columns in ASCII table view"""
@@ -92,6 +82,8 @@ def config(args):
 
 def contacts_add(args):
     """Sub command for contacts add"""
+    from .lib.contacts import Contacts
+
     contacts = Contacts(cfg)
 
     if args.file:
@@ -109,12 +101,16 @@ def contacts_add(args):
 
 def contacts_list(args):
     """Sub command for contacts list"""
+    from .lib.contacts import Contacts
+
     check_columns(args.columns)
     contacts = Contacts(cfg, format=args.output)
     contacts.list(id=args.id, name=args.name, email=args.email, phone=args.phone, sort=args.sort, reverse=args.reverse, limit=args.limit)
 
 def contacts_remove(args):
     """Sub command for contacts remove"""
+    from .lib.contacts import Contacts
+
     contacts = Contacts(cfg)
     contacts.remove(id=args.id, name=args.name, email=args.email, phone=args.phone)
 
@@ -126,22 +122,30 @@ def contacts(args):
 
 def dashboard(args):
     """Sub command for dashboard"""
+    import webbrowser
+
     webbrowser.open('https://monitoring.platform360.io/')
 
 # --- incidents functions ---
 
 def incidents_add(args):
     """Sub command for incidents add"""
+    from .lib.incidents import Incidents
+
     incidents = Incidents(cfg)
     incidents.add(page_id=args.page_id, name=args.name, body=args.body)
 
 def incidents_list(args):
     """Sub command for incidents list"""
+    from .lib.incidents import Incidents
+
     incidents = Incidents(cfg, format=args.output)
     incidents.list(page_id=args.page_id, name=args.name)
 
 def incidents_remove(args):
     """Sub command for incidents remove"""
+    from .lib.incidents import Incidents
+
     incidents = Incidents(cfg)
     incidents.remove(page_id=args.page_id, id=args.id, name=args.name)
 
@@ -153,6 +157,10 @@ def incidents(args):
 
 def magiclinks_create(args):
     """Sub command for magiclink create"""
+    import webbrowser
+    from .lib.magiclinks import MagicLinks
+    from .lib.servers import Servers
+
     serverId = ''
     usertoken = args.usertoken if args.usertoken else cfg.usertoken
 
@@ -185,6 +193,8 @@ def magiclinks(args):
 
 def nodes(args):
     """Sub command for nodes"""
+    from .lib.nodes import Nodes
+
     check_columns(args.columns)
     nodes = Nodes(cfg, format=args.output)
     nodes.list(id=args.id, name=args.name, sort=args.sort, reverse=args.reverse, limit=args.limit)
@@ -193,6 +203,8 @@ def nodes(args):
 
 def recommendations(args):
     """Sub command for recommendations"""
+    from .lib.recommendations import Recommendations
+
     recommendations = Recommendations(cfg)
     recommendations.print(format=args.output)
 
@@ -200,6 +212,8 @@ def recommendations(args):
 
 def servers_add(args):
     """Sub command for servers add"""
+    from .lib.usertokens import UserTokens
+
     usertokens = UserTokens(cfg)
     token = usertokens.token()
     if not token:
@@ -220,6 +234,10 @@ def servers_charts(args):
 
 def servers_charts_create(args):
     """Sub command for servers charts"""
+    import webbrowser
+    from .lib.servercharts import ServerCharts
+    from .lib.servers import Servers
+
     serverId = ''
     startDate = datetime.strptime(args.start.strip('\"'), '%Y-%m-%d').timestamp() if args.start else 0
     endDate = datetime.strptime(args.end.strip('\"'), '%Y-%m-%d').timestamp() if args.end else 0
@@ -242,10 +260,24 @@ def servers_charts_create(args):
 
 def servers_events(args):
     """Sub command for servers events"""
+    from .lib.servernotifications import ServerNotifications
+    from .lib.servers import Servers
+
     serverId = ''
     startDate = datetime.strptime(args.start.strip('\"'), '%Y-%m-%d') if args.start else (datetime.today() - timedelta(days=365))
     endDate = datetime.strptime(args.end.strip('\"'), '%Y-%m-%d') if args.end else datetime.now()
 
+    # events of several servers are fetched in parallel and merged by time
+    if args.all or args.tag or args.pattern:
+        if args.sort or args.reverse:
+            print('ERROR: --sort and --reverse cannot be used together with --all, --tag or --pattern. Events of several servers are always listed in order of their start time')
+            return
+
+        servers = Servers(cfg)
+        notifications = ServerNotifications(cfg, format=args.output)
+        notifications.listAll(servers.select(args.tag, args.pattern), startDate.timestamp(), endDate.timestamp(), args.limit, args.parallel)
+        return
+
     if args.id:
         serverId = args.id
     elif args.name:
@@ -258,6 +290,8 @@ def servers_events(args):
 
 def servers_list(args):
     """Sub command for servers list"""
+    from .lib.servers import Servers
+
     check_columns(args.columns)
     servers = Servers(cfg, format=args.output)
     servers.list(args.issues, args.sort, args.reverse, args.limit, args.tag)
@@ -269,6 +303,8 @@ def servers_remove(args):
 
 def servers_update(args):
     """Sub command for servers update"""
+    from .lib.servers import Servers
+
     servers = Servers(cfg)
     pattern = ''
     if args.id:
@@ -285,12 +321,17 @@ def servers(args):
 
 def signup(args):
     """Sub command for signup"""
+    import webbrowser
+
     webbrowser.open('https://360monitoring.com/monitoring-trial/')
 
 # --- sites functions ---
 
 def sites_add(args):
     """Sub command for sites add"""
+    from .lib.nodes import Nodes
+    from .lib.sites import Sites
+
     sites = Sites(cfg)
     nodeId = ''
 
@@ -304,8 +345,7 @@ def sites_add(args):
         if os.path.isfile(args.file):
             with open(args.file) as file:
                 lines = file.readlines()
-                for line in lines:
-                    sites.add(line.strip(), protocol=args.protocol, name=args.name, port=args.port, keyword=args.keyword, matchType=args.match_type, nodeId=nodeId, force=args.force)
+                sites.addBulk(lines, protocol=args.protocol, name=args.name, port=args.port, keyword=args.keyword, matchType=args.match_type, nodeId=nodeId, force=args.force, resultFile=args.result_file)
         else:
             print('ERROR: File', args.file, 'to import not found')
     elif args.url:
@@ -319,6 +359,10 @@ def sites_charts(args):
 
 def sites_charts_create(args):
     """Sub command for sites charts"""
+    import webbrowser
+    from .lib.sitecharts import SiteCharts
+    from .lib.sites import Sites
+
     siteId = ''
     startDate = datetime.strptime(args.start.strip('\"'), '%Y-%m-%d').timestamp() if args.start else 0
     endDate = datetime.strptime(args.end.strip('\"'), '%Y-%m-%d').timestamp() if args.end else 0
@@ -341,6 +385,9 @@ def sites_charts_create(args):
 
 def sites_events(args):
     """Sub command for sites events"""
+    from .lib.sitenotifications import SiteNotifications
+    from .lib.sites import Sites
+
     siteId = ''
     startDate = datetime.strptime(args.start.strip('\"'), '%Y-%m-%d') if args.start else (datetime.today() - timedelta(days=365))
     endDate = datetime.strptime(args.end.strip('\"'), '%Y-%m-%d') if args.end else datetime.now()
@@ -357,21 +404,71 @@ def sites_events(args):
 
 def sites_list(args):
     """Sub command for sites list"""
+    from .lib.sites import Sites
+
     check_columns(args.columns)
     sites = Sites(cfg, format=args.output)
     sites.list(id=args.id, url=args.url, name=args.name, location=args.location, pattern=args.pattern, issuesOnly=args.issues, sort=args.sort, reverse=args.reverse, limit=args.limit)
 
 def sites_remove(args):
     """Sub command for sites remove"""
+    from .lib.sites import Sites
+
     sites = Sites(cfg)
-    sites.remove(id=args.id, url=args.url, name=args.name, location=args.location, pattern=args.pattern)
+    sites.remove(id=args.id, url=args.url, name=args.name, location=args.location, pattern=args.pattern, journal=args.journal, maxWorkers=args.parallel)
+
+def uptime_periods(args):
+    """Return the uptime periods selected by the arguments of sites uptime as list of [start, end] timestamps and the date format to print them"""
+
+    startDate = datetime.strptime(args.start.strip('\"'), '%Y-%m-%d') if args.start else (datetime.today() - timedelta(days=365))
+    endDate = datetime.strptime(args.end.strip('\"'), '%Y-%m-%d') if args.end else datetime.now()
+
+    if args.daily:
+        periods = []
+        firstDate = startDate
+        while endDate > firstDate:
+            startDate = datetime(endDate.year, endDate.month, endDate.day, 0, 0, 0)
+            endDate = datetime(endDate.year, endDate.month, endDate.day, 23, 59, 59)
+            periods.append([startDate.timestamp(), endDate.timestamp()])
+            endDate = startDate - timedelta(days=1)
+        return periods, '%Y-%m-%d'
+    elif args.monthly:
+        periods = []
+        firstDate = startDate
+        while endDate > firstDate:
+            startDate = datetime(endDate.year, endDate.month, 1, 0, 0, 0)
+            endDate = datetime(endDate.year, endDate.month, endDate.day, 23, 59, 59)
+            periods.append([startDate.timestamp(), endDate.timestamp()])
+            endDate = startDate - timedelta(days=1)
+        return periods, '%Y-%m'
+    elif args.start or args.end:
+        return [[startDate.timestamp(), endDate.timestamp()]], '%Y-%m-%d'
+    else:
+        periods = []
+        periods.append([(datetime.now() - timedelta(days=1)).timestamp(), datetime.now().timestamp()])
+        periods.append([(datetime.now() - timedelta(days=7)).timestamp(), datetime.now().timestamp()])
+        periods.append([(datetime.now() - timedelta(days=30)).timestamp(), datetime.now().timestamp()])
+        periods.append([(datetime.now() - timedelta(days=90)).timestamp(), datetime.now().timestamp()])
+        periods.append([(datetime.now() - timedelta(days=365)).timestamp(), datetime.now().timestamp()])
+        return periods, '%Y-%m-%d'
 
 def sites_uptime(args):
     """Sub command for sites uptime"""
+    from .lib.functions import printError
+    from .lib.sites import Sites
+
     siteId = ''
-    startDate = datetime.strptime(args.start.strip('\"'), '%Y-%m-%d') if args.start else (datetime.today() - timedelta(days=365))
-    endDate = datetime.strptime(args.end.strip('\"'), '%Y-%m-%d') if args.end else datetime.now()
-    sites = Sites(cfg)
+    sites = Sites(cfg, format=args.output)
+
+    # location and pattern select the sites of --all, a single site is specified by id, url or name
+    if not args.all and (args.location or args.pattern):
+        printError('ERROR: --location and --pattern can only be used together with --all. Use --id, --url or --name to show the uptime of a single site')
+        return
+
+    if args.all:
+        periods, dateTimeFormat = uptime_periods(args)
+        sites.listAllUptimes(periods, dateTimeFormat, location=args.location, pattern=args.pattern, local=args.local, maxWorkers=args.parallel)
+        return
 
     if args.id:
         siteId = args.id
@@ -381,34 +478,8 @@ def sites_uptime(args):
         siteId = sites.getSiteId(args.name)
 
     if siteId:
-        if args.daily:
-            periods = []
-            firstDate = startDate
-            while endDate > firstDate:
-                startDate = datetime(endDate.year, endDate.month, endDate.day, 0, 0, 0)
-                endDate = datetime(endDate.year, endDate.month, endDate.day, 23, 59, 59)
-                periods.append([startDate.timestamp(), endDate.timestamp()])
-                endDate = startDate - timedelta(days=1)
-            sites.listUptimes(siteId, periods)
-        elif args.monthly:
-            periods = []
-            firstDate = startDate
-            while endDate > firstDate:
-                startDate = datetime(endDate.year, endDate.month, 1, 0, 0, 0)
-                endDate = datetime(endDate.year, endDate.month, endDate.day, 23, 59, 59)
-                periods.append([startDate.timestamp(), endDate.timestamp()])
-                endDate = startDate - timedelta(days=1)
-            sites.listUptimes(siteId, periods, '%Y-%m')
-        elif args.start or args.end:
-            sites.listUptimes(siteId, [[startDate.timestamp(), endDate.timestamp()]])
-        else:
-            periods = []
-            periods.append([(datetime.now() - timedelta(days=1)).timestamp(), datetime.now().timestamp()])
-            periods.append([(datetime.now() - timedelta(days=7)).timestamp(), datetime.now().timestamp()])
-            periods.append([(datetime.now() - timedelta(days=30)).timestamp(), datetime.now().timestamp()])
-            periods.append([(datetime.now() - timedelta(days=90)).timestamp(), datetime.now().timestamp()])
-            periods.append([(datetime.now() - timedelta(days=365)).timestamp(), datetime.now().timestamp()])
-            sites.listUptimes(siteId, periods)
+        periods, dateTimeFormat = uptime_periods(args)
+        sites.listUptimes(siteId, periods, dateTimeFormat, local=args.local)
 
 def sites(args):
     """Sub command for sites"""
@@ -418,6 +489,9 @@ def sites(args):
 
 def statistics(args):
     """Sub command for statistics"""
+    from .lib.statistics import Statistics
+
+    cfg.timings = args.timings
     statistics = Statistics(cfg)
     statistics.print(format=args.output)
 
@@ -425,11 +499,15 @@ def statistics(args):
 
 def usertokens_create(args):
     """Sub command for usertokens create"""
+    from .lib.usertokens import UserTokens
+
     usertokens = UserTokens(cfg)
     usertokens.create(name=args.name, tags=args.tag)
 
 def usertokens_list(args):
     """Sub command for usertokens list"""
+    from .lib.usertokens import UserTokens
+
     usertokens = UserTokens(cfg)
     usertokens.list(format=args.output)
 
@@ -441,6 +519,8 @@ def usertokens(args):
 
 def wptoolkit(args):
     """Sub command for wptoolkit"""
+    from .lib.wptoolkit import WPToolkit
+
     check_columns(args.columns)
     wptoolkit = WPToolkit(cfg)
     wptoolkit.print(format=args.output, issuesOnly=args.issues, sort=args.sort, reverse=args.reverse, limit=args.limit)
@@ -452,6 +532,8 @@ def performCLI():
 
     subparsers = cli.add_subparsers(title='commands', dest='subparser')
     cli.add_argument('-v', '--version', action='store_true', help='print CLI version')
+    cli.add_argument('--no-cache', action='store_true', help='do not use the local response cache even if enabled in ' + cfg.filename)
+    cli.add_argument('--refresh', action='store_true', help='ignore cached responses and download fresh data into the local response cache')
 
     # config
 
@@ -493,8 +575,9 @@ def performCLI():
     cli_contacts_list.add_argument('--reverse', action='store_true', help='show in descending order. Works only together with --sort')
     cli_contacts_list.add_argument('--limit', nargs='?', default=0, type=int, metavar='n', help='limit the number of printed items')
 
-    cli_contacts_list.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_contacts_list.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_contacts_list.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_contacts_list.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_contacts_list.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_contacts_list.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -527,8 +610,9 @@ def performCLI():
     cli_incidents_list.add_argument('--page-id', required=True, metavar='id', help='list incidents from status page with given ID')
     cli_incidents_list.add_argument('--name', nargs='?', default='', metavar='name', help='list incidents with given name')
 
-    cli_incidents_list.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_incidents_list.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_incidents_list.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_incidents_list.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_incidents_list.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_incidents_list.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -563,8 +647,9 @@ def performCLI():
     cli_nodes.add_argument('--reverse', action='store_true', help='show in descending order. Works only together with --sort')
     cli_nodes.add_argument('--limit', nargs='?', default=0, type=int, metavar='n', help='limit the number of printed items')
 
-    cli_nodes.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_nodes.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_nodes.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_nodes.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_nodes.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_nodes.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -597,20 +682,25 @@ def performCLI():
     cli_servers_charts_create.add_argument('--end', nargs='?', default='', metavar='end', help='select end date of chart period in form of \"yyyy-mm-dd\" (optional)')
     cli_servers_charts_create.add_argument('--open', action='store_true', help='open the metrics chart directly in the default web browser (optional)')
 
-    cli_servers_events = cli_servers_subparsers.add_parser('events', help='list event notifications of a specified server')
+    cli_servers_events = cli_servers_subparsers.add_parser('events', help='list event notifications of a specified server or of several servers merged by time')
     cli_servers_events.set_defaults(func=servers_events)
     cli_servers_events.add_argument('--id', nargs='?', default='', metavar='id', help='show event notifications for server with given ID')
     cli_servers_events.add_argument('--name', nargs='?', default='', metavar='name', help='show event notifications for server with given name')
+    cli_servers_events.add_argument('--all', action='store_true', help='show event notifications of all servers merged by time')
+    cli_servers_events.add_argument('--tag', nargs='*', default='', metavar='tag', help='show event notifications of all servers matching all these tags. Use "a|b" for servers with tag a or b and "!a" for servers without tag a')
+    cli_servers_events.add_argument('--pattern', nargs='?', default='', metavar='pattern', help='show event notifications of all servers with pattern included in their name')
+    cli_servers_events.add_argument('--parallel', nargs='?', default=0, type=int, metavar='n', help='number of servers to fetch event notifications for in parallel (default: max-workers from config file)')
     cli_servers_events.add_argument('--start', nargs='?', default='', metavar='start', help='select start date of notification period in form of yyyy-mm-dd')
     cli_servers_events.add_argument('--end', nargs='?', default='', metavar='end', help='select end date of notification period in form of yyyy-mm-dd')
 
     cli_servers_events.add_argument('--columns', nargs='*', default='', metavar='col', help='specify columns to print in table view or remove columns with 0 as prefix e.g. "0id"')
-    cli_servers_events.add_argument('--sort', nargs='?', default='', metavar='col', help='sort by specified column. Reverse sort by adding --reverse')
+    cli_servers_events.add_argument('--sort', nargs='?', default='', metavar='col', help='sort by specified column. Reverse sort by adding --reverse. Not supported together with --all, --tag or --pattern')
     cli_servers_events.add_argument('--reverse', action='store_true', help='show in descending order. Works only together with --sort')
     cli_servers_events.add_argument('--limit', nargs='?', default=0, type=int, metavar='n', help='limit the number of printed items')
 
-    cli_servers_events.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_servers_events.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_servers_events.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_servers_events.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_servers_events.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_servers_events.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -618,7 +708,7 @@ def performCLI():
     cli_servers_list.set_defaults(func=servers_list)
     cli_servers_list.add_argument('--id', nargs='?', default='', metavar='id', help='update server with given ID')
     cli_servers_list.add_argument('--name', nargs='?', default='', metavar='name', help='update server with given name')
-    cli_servers_list.add_argument('--tag', nargs='*', default='', metavar='tag', help='only list servers matching these tags')
+    cli_servers_list.add_argument('--tag', nargs='*', default='', metavar='tag', help='only list servers matching all these tags. Use "a|b" for servers with tag a or b and "!a" for servers without tag a')
     cli_servers_list.add_argument('--issues', action='store_true', help='show only servers with issues')
 
     cli_servers_list.add_argument('--columns', nargs='*', default='', metavar='col', help='specify columns to print in table view or remove columns with 0 as prefix e.g. "0id"')
@@ -626,8 +716,9 @@ def performCLI():
     cli_servers_list.add_argument('--reverse', action='store_true', help='show in descending order. Works only together with --sort')
     cli_servers_list.add_argument('--limit', nargs='?', default=0, type=int, metavar='n', help='limit the number of printed items')
 
-    cli_servers_list.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_servers_list.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_servers_list.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_servers_list.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_servers_list.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_servers_list.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -663,6 +754,7 @@ def performCLI():
     cli_sites_add.add_argument('--node-name', nargs='?', metavar='id', help='name of the monitoring node location that should monitor the url. In doubt, take the first match. (optional)')
     cli_sites_add.add_argument('--force', action='store_true', help='add new monitor even if already exists')
     cli_sites_add.add_argument('--file', nargs='?', default='', metavar='file', help='file containing one URL per line to monitor')
+    cli_sites_add.add_argument('--result-file', nargs='?', default='', metavar='file', help='write the result for each URL of --file as JSON to this file (optional)')
 
     cli_sites_charts = cli_sites_subparsers.add_parser('charts', help='create a metrics chart as PNG file and print its url or open it in your browser')
     cli_sites_charts.set_defaults(func=sites_charts)
@@ -687,8 +779,9 @@ def performCLI():
     cli_sites_events.add_argument('--reverse', action='store_true', help='show in descending order. Works only together with --sort')
     cli_sites_events.add_argument('--limit', nargs='?', default=0, type=int, metavar='n', help='limit the number of printed items')
 
-    cli_sites_events.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_sites_events.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_sites_events.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_sites_events.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_sites_events.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_sites_events.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -706,8 +799,9 @@ def performCLI():
     cli_sites_list.add_argument('--reverse', action='store_true', help='show in descending order. Works only together with --sort')
     cli_sites_list.add_argument('--limit', nargs='?', default=0, type=int, metavar='n', help='limit the number of printed items')
 
-    cli_sites_list.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_sites_list.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_sites_list.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_sites_list.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_sites_list.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_sites_list.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -718,6 +812,8 @@ def performCLI():
     cli_sites_remove.add_argument('--name', nargs='?', default='', metavar='name', help='remove site with given name')
     cli_sites_remove.add_argument('--location', nargs='?', default='', metavar='location', help='remove sites monitored from given location')
     cli_sites_remove.add_argument('--pattern', nargs='?', default='', metavar='pattern', help='remove sites with pattern included in URL')
+    cli_sites_remove.add_argument('--parallel', nargs='?', default=0, type=int, metavar='n', help='number of sites to remove in parallel (default: max-workers from config file)')
+    cli_sites_remove.add_argument('--journal', nargs='?', default='', metavar='file', help='record the removal plan and progress in this file. If it exists, only the removals that did not complete yet are retried')
 
     cli_sites_uptime = cli_sites_subparsers.add_parser('uptime', help='show uptime')
     cli_sites_uptime.set_defaults(func=sites_uptime)
@@ -728,6 +824,16 @@ def performCLI():
     cli_sites_uptime.add_argument('--end', nargs='?', default='', metavar='end', help='select end date of uptime period in form of yyyy-mm-dd')
     cli_sites_uptime.add_argument('--daily', action='store_true', help='show uptime per day')
     cli_sites_uptime.add_argument('--monthly', action='store_true', help='show uptime per month')
+    cli_sites_uptime.add_argument('--local', action='store_true', help='compute uptime from the notification history of the site, retrieved with a single request instead of one request per period')
+    cli_sites_uptime.add_argument('--all', action='store_true', help='show uptime for all sites, followed by the average uptime of all sites per period')
+    cli_sites_uptime.add_argument('--location', nargs='?', default='', metavar='location', help='show uptime for all sites monitored from given location. Works only together with --all')
+    cli_sites_uptime.add_argument('--pattern', nargs='?', default='', metavar='pattern', help='show uptime for all sites with pattern included in URL. Works only together with --all')
+    cli_sites_uptime.add_argument('--parallel', nargs='?', default=0, type=int, metavar='n', help='number of uptime requests to send in parallel (default: max-workers from config file)')
+
+    cli_sites_uptime.add_argument('--output', choices=['ndjson', 'csv', 'table'], default='table', help='output format for the data of --all')
+    cli_sites_uptime.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data of --all as newline delimited JSON with one compact object per line')
+    cli_sites_uptime.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data of --all in CSV format')
+    cli_sites_uptime.add_argument('--table', action='store_const', const='table', dest='output', help='print data of --all as ASCII table')
 
     # statistics
 
@@ -736,6 +842,7 @@ def performCLI():
     cli_statistics.add_argument('--output', choices=['csv', 'table'], default='table', help='output format for the data')
     cli_statistics.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_statistics.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
+    cli_statistics.add_argument('--timings', action='store_true', help='print number of requests and time spent per API endpoint')
 
     # user tokens
 
@@ -750,8 +857,9 @@ def performCLI():
 
     cli_usertokens_list = cli_usertokens_subparsers.add_parser('list', help='list usertokens')
     cli_usertokens_list.set_defaults(func=usertokens_list)
-    cli_usertokens_list.add_argument('--output', choices=['json', 'csv', 'table'], default='table', help='output format for the data')
+    cli_usertokens_list.add_argument('--output', choices=['json', 'ndjson', 'csv', 'table'], default='table', help='output format for the data')
     cli_usertokens_list.add_argument('--json', action='store_const', const='json', dest='output', help='print data in JSON format')
+    cli_usertokens_list.add_argument('--ndjson', action='store_const', const='ndjson', dest='output', help='print data as newline delimited JSON with one compact object per line')
     cli_usertokens_list.add_argument('--csv', action='store_const', const='csv', dest='output', help='print data in CSV format')
     cli_usertokens_list.add_argument('--table', action='store_const', const='table', dest='output', help='print data as ASCII table')
 
@@ -787,6 +895,10 @@ def performCLI():
     cli_subcommands['wptoolkit'] = cli_wptoolkit
 
     args = cli.parse_args()
+
+    cfg.no_cache = args.no_cache
+    cfg.cache_refresh = args.refresh
+
     if args.subparser == None:
         if args.version:
             print('360 Monitoring CLI Version:', __version__)
@@ -816,8 +928,30 @@ def performCLI():
         args.func(args)
 
 def main():
-    check_version()
-    performCLI()
+    global cfg
+    cfg = Config(__version__)
+
+    try:
+        check_version()
+        performCLI()
+
+        if cfg.timings:
+            from .lib.api import printTimings
+            printTimings()
+
+        if cfg.debug:
+            from .lib.api import printConnectionStats, printRateLimiterStats
+            from .lib.cache import printCacheStats
+            from .lib.repository import printRepositoryStats
+            printConnectionStats()
+            printRateLimiterStats()
+            printCacheStats()
+            printRepositoryStats()
+    except BrokenPipeError:
+        # output was piped to a command that stopped reading, e.g. "| head"
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -46,11 +46,319 @@ function test
     fi
 }
 
+# Function to test helper functions of the CLI that need no API access
+# Parameters: 1 description, 2 Python code that fails if the result is wrong
+function check
+{
+    echo "$1"
+    echo "$1" >> "$LOG_FILE"
+
+    # check if Python exits with an error, e.g. for a failed assertion, and exit if it does
+    if ! python3 -c "$2" >> "$LOG_FILE" 2>&1; then
+        echo
+        echo "-------------------------------------"
+        echo " Test failed for $1"
+        echo "-------------------------------------"
+        exit 1
+    fi
+}
+
 echo "--- Test $NOW ---" > "$LOG_FILE"
 
 SITE_URL="www.bild.de"
 STATUS_PAGE_ID="628e185426cd9d5c1430602e"
 TEST_EMAIL_ADDRESS="no-reply@webpros.com"
+JOURNAL_SITE_URL="www.example.com"
+JOURNAL_FILE="test_remove.journal"
+
+check "tag expressions" "
+from cli360monitoring.lib.tags import buildTagIndex, matchTags, hasTags, plainTags
+servers = [{'tags': ['web', 'eu']}, {'tags': ['db']}, {'tags': None}]
+index = buildTagIndex(servers)
+assert matchTags(index, 3, ['web|db']) == [0, 1]
+assert matchTags(index, 3, ['!web']) == [1, 2]
+assert matchTags(index, 3, ['web', 'eu']) == [0]
+assert matchTags(index, 3, []) == [0, 1, 2]
+assert hasTags(['web', 'eu'], ['web|db', '!test']) and not hasTags(['db'], ['!db'])
+assert plainTags(['web', 'a|b', '!c', '']) == ['web']
+"
+
+check "retry budget and delay" "
+from types import SimpleNamespace
+from cli360monitoring.lib.api import RetryBudget, retryDelay, MAX_RETRY_DELAY
+budget = RetryBudget(2)
+assert budget.take() and budget.take() and not budget.take()
+budget.pause(5)
+assert 4 < budget.remaining() <= 5
+assert retryDelay(SimpleNamespace(headers={'Retry-After': '3'}), 0, 1) == 3
+assert retryDelay(SimpleNamespace(headers={'Retry-After': '9999'}), 0, 1) == MAX_RETRY_DELAY
+assert 2 <= retryDelay(SimpleNamespace(headers={}), 2, 1) <= 4
+assert 0.5 <= retryDelay(None, 0, 1) <= 1
+assert retryDelay(None, 100, 1) <= MAX_RETRY_DELAY
+"
+
+check "rate limiter" "
+import time, asyncio
+from cli360monitoring.lib.api import RateLimiter, rateLimiter
+from cli360monitoring.lib.config import Config
+from cli360monitoring.lib.workers import runConcurrent
+config = Config('test')
+config.rate_limit = 0
+assert rateLimiter(config) is None
+# a burst of 2 requests is sent at once, the other 4 requests wait for 1 / 20 seconds each
+limiter = RateLimiter(20, 2)
+start = time.monotonic()
+delays = [limiter.acquire() for i in range(6)]
+elapsed = time.monotonic() - start
+assert delays[:2] == [0, 0] and all(delay > 0 for delay in delays[2:]) and limiter.waits == 4
+assert 0.18 <= elapsed < 0.5 and abs(limiter.waited - sum(delays)) < 0.001
+# requests of parallel threads and async tasks share the same rate
+limiter = RateLimiter(50, 1)
+start = time.monotonic()
+runConcurrent(lambda i: limiter.acquire(), range(16), 8)
+assert 0.28 <= time.monotonic() - start < 0.8
+async def tasks():
+    await asyncio.gather(*[limiter.acquireAsync() for i in range(10)])
+start = time.monotonic()
+asyncio.run(tasks())
+assert 0.18 <= time.monotonic() - start < 0.6
+"
+
+check "response cache" "
+import os, stat, time, tempfile
+from cli360monitoring.lib.cache import ResponseCache
+from cli360monitoring.lib.config import Config
+config = Config('test')
+config.cache_directory = os.path.join(tempfile.mkdtemp(), 'cache')
+config.cache_ttl = 60
+config.cache_max_size = 0.001
+config.cache_refresh = False
+cache = ResponseCache(config)
+params = {'perpage': 10}
+cache.set('servers', params, {'servers': [1, 2]})
+filename = cache.filename('servers', params)
+assert cache.get('servers', params) == {'servers': [1, 2]} and cache.get('servers', {'perpage': 20}) is None
+assert stat.S_IMODE(os.stat(filename).st_mode) == 0o600 and stat.S_IMODE(os.stat(config.cache_directory).st_mode) & 0o077 == 0
+os.utime(filename, (time.time() - 120, time.time() - 120))
+assert cache.get('servers', params) is None and cache.get('servers', params, ttl=300) == {'servers': [1, 2]}
+config.cache_refresh = True
+assert cache.get('servers', params, ttl=300) is None
+config.cache_refresh = False
+for path in ('usertoken', 'magiclink', '/usertoken/', 'usertoken/abc'):
+    cache.set(path, params, {'tokens': ['secret']})
+    assert cache.get(path, params) is None and not os.path.exists(cache.filename(path, params))
+# max-size-mb of about 1 KB only keeps the most recently written entries of 300 bytes
+for page in range(6):
+    cache.set('servers', {'page': page}, {'servers': 'x' * 280})
+    os.utime(cache.filename('servers', {'page': page}), (time.time() - 100 + page, time.time() - 100 + page))
+assert [os.path.exists(cache.filename('servers', {'page': page})) for page in range(6)] == [False, False, False, True, True, True]
+assert sum(entry.stat().st_size for entry in os.scandir(config.cache_directory)) <= 1024 * 1024 * config.cache_max_size
+"
+
+check "incremental JSON parser" "
+import json
+from cli360monitoring.lib.jsonstream import iterArrayItems
+document = {'total': -12.5e3, 'meta': {'servers': ['not', 'this']}, 'servers': [
+    {'id': 's1', 'name': 'm\\u00fcnchen \\\\ \\\"quoted\\\" \\n', 'tags': [], 'cpu': 0.125, 'ok': True, 'none': None},
+    {'id': 's2', 'name': 'Zürich 東京 😀', 'tags': ['a,b', ']', '}'], 'cpu': 1234567890123, 'ok': False, 'nested': [[1, [2]], {'x': {}}]},
+    42, -0.5, 'text', True, False, None, [], {}], 'after': 'ignored'}
+for text in (json.dumps(document, ensure_ascii=False, indent=1), json.dumps(document)):
+    data = text.encode('utf-8')
+    expected = json.loads(text)['servers']
+    assert list(iterArrayItems((data[i:i + 1] for i in range(len(data))), 'servers')) == expected
+    assert list(iterArrayItems((text[i:i + 1] for i in range(len(text))), 'servers')) == expected
+    assert list(iterArrayItems([data], 'servers')) == expected
+assert list(iterArrayItems([b'{\\\"servers\\\": [12', b'34, 5', b'6]}'], 'servers')) == [1234, 56]
+assert list(iterArrayItems([b'{\\\"total\\\": 0}'], 'servers')) == []
+assert list(iterArrayItems([b' { \\\"servers\\\" : [ ] } '], 'servers')) == []
+assert list(iterArrayItems([b'{}'], 'servers')) == []
+"
+
+check "pagination" "
+import threading
+from cli360monitoring.lib import pagination
+from cli360monitoring.lib.config import Config
+def fakeApi(count, pages, total):
+    records = [{'id': 'r' + str(i)} for i in range(count)]
+    requests = []
+    def apiGet(path, config, params=None, cacheable=False):
+        page = params.get('page', 1) if pages else 1
+        requests.append((page, params['perpage'], threading.current_thread() is threading.main_thread()))
+        response = {'items': records[(page - 1) * params['perpage']:page * params['perpage']]}
+        if total:
+            response['total'] = count
+        return response
+    pagination.apiGet = apiGet
+    return records, requests
+def fetch(count, pages, total, maxItems):
+    records, requests = fakeApi(count, pages, total)
+    config = Config('test')
+    config.page_size = 1000
+    config.max_items = maxItems
+    config.max_workers = 4
+    config.debug = False
+    return records, requests, pagination.apiGetAll('items', 'items', config)
+for total in (True, False):
+    records, requests, result = fetch(2500, True, total, 5000)
+    assert result['items'] == records and [request[:2] for request in requests] == [(1, 1000), (2, 1000), (3, 1000)]
+    # with a known total the other pages are fetched in parallel by worker threads
+    assert all(request[2] != total for request in requests[1:])
+    records, requests, result = fetch(2500, True, total, 1500)
+    assert result['items'] == records[:1500] and len(requests) == 2
+    records, requests, result = fetch(2000, True, total, 5000)
+    assert result['items'] == records and len(requests) == (2 if total else 3)
+    # the API returns the first page for every page, all records are fetched with a single request instead
+    records, requests, result = fetch(2500, False, total, 5000)
+    assert result['items'] == records and requests[-1][:2] == (1, 5000) and [request[1] for request in requests].count(5000) == 1
+    records, requests, result = fetch(2500, False, total, 1500)
+    assert result['items'] == records[:1500]
+"
+
+check "sorted tables" "
+import random
+from cli360monitoring.lib.tables import SortableTable
+random.seed(1)
+table = SortableTable(['Name', 'Usage %', 'Tags'])
+for i in range(200):
+    usage = random.choice([None, '', 0, 1.5, 2, 50, 99.9, random.randint(0, 100)])
+    table.addRow(['host' + str(i), str(usage), random.choice(['', 'a', 'b'])], ['host' + str(i % 50), usage, random.choice(['', 'a', 'b'])])
+for sort in ('Name', 'Usage %', '2', 'Tags'):
+    for reverse in (False, True):
+        full = table.sortedRows(sort, reverse)
+        index = table.sortIndex(sort, table.field_names)
+        values = [row[0][index] for row in full]
+        filled = [value for value in values if value not in (None, '')]
+        assert values == filled + [value for value in values if value in (None, '')]
+        for limit in (1, 5, 37, 199, 200, 500):
+            assert table.sortedRows(sort, reverse, limit) == full[:limit]
+table.setFooter(['Total', '100', ''])
+table.addFooter(['Average', '50', ''])
+lines = table.getString(sort='Usage %', limit=3).split('\\n')
+assert len(lines) == 3 + 3 + 2 + 2 and lines[0] == lines[2] == lines[-4] == lines[-1]
+assert [line.split('|')[1].strip() for line in lines[-3:-1]] == ['Total', 'Average']
+assert sum('Total' in line for line in lines) == 1
+"
+
+check "async runner" "
+import asyncio
+from cli360monitoring.lib.asyncapi import runAsync
+async def double(number):
+    await asyncio.sleep(0.01 * (5 - number))
+    if number == 3:
+        raise ValueError(number)
+    return number * 2
+results = runAsync(double, range(5), limit=2)
+assert results[:3] == [0, 2, 4] and isinstance(results[3], ValueError) and results[4] == 8
+"
+
+check "sites remove via the async client without aiohttp" "
+import io, contextlib
+from types import SimpleNamespace
+from cli360monitoring.lib import asyncapi
+from cli360monitoring.lib.config import Config
+from cli360monitoring.lib.records import MonitorRecord
+from cli360monitoring.lib.sites import Sites
+requests = []
+def apiRequest(method, path, config, params=None, data=None):
+    requests.append((method, path))
+    status = {'monitor/m1': 204, 'monitor/m2': 404, 'monitor/m3': 500}[path]
+    return SimpleNamespace(status_code=status, ok=status < 400)
+asyncapi.aiohttp = None
+asyncapi.apiRequest = apiRequest
+def remove(readonly):
+    config = Config('test')
+    config.api_key = 'test'
+    config.debug = True
+    config.readonly = readonly
+    sites = Sites(config)
+    sites.monitors = [MonitorRecord({'id': 'm' + str(i), 'url': 'site' + str(i), 'monitor': {'name': 'Frankfurt'}, 'uptime_percentage': 100}) for i in range(1, 4)]
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = sites.remove(pattern='site', maxWorkers=2)
+    return result, output.getvalue()
+result, output = remove(readonly=True)
+assert result is False and requests == [] and 'Readonly mode' in output
+result, output = remove(readonly=False)
+assert result is False and sorted(requests) == [('DELETE', 'monitor/m1'), ('DELETE', 'monitor/m2'), ('DELETE', 'monitor/m3')]
+assert 'DELETE ' + Config('test').endpoint + 'monitor/m1' in output
+assert 'Removed site monitor: site1 [m1]' in output and 'Removed site monitor: site2 [m2]' in output
+assert 'Failed to remove site monitor site3 [m3] (status 500)' in output
+"
+
+check "cached responses are invalidated once per bulk write" "
+import io, contextlib
+from types import SimpleNamespace
+from cli360monitoring.lib import api, asyncapi
+from cli360monitoring.lib.config import Config
+from cli360monitoring.lib.records import MonitorRecord
+from cli360monitoring.lib.sites import Sites
+invalidations = []
+api.apiInvalidateCache = lambda config: invalidations.append(config)
+api.apiRequest = asyncapi.apiRequest = lambda method, path, config, params=None, data=None: SimpleNamespace(status_code=200 if method == 'POST' else 204, ok=True)
+asyncapi.aiohttp = None
+config = Config('test')
+config.api_key = 'test'
+config.readonly = False
+sites = Sites(config)
+sites.monitors = [MonitorRecord({'id': 'm' + str(i), 'url': 'site' + str(i), 'monitor': {'name': 'Frankfurt'}, 'uptime_percentage': 100}) for i in range(5)]
+with contextlib.redirect_stdout(io.StringIO()):
+    assert sites.addBulk(['new' + str(i) for i in range(5)])
+    assert len(invalidations) == 1
+    assert sites.remove(pattern='site')
+    assert len(invalidations) == 2
+    api.apiSend('PUT', 'monitor/m1', config, data={'name': 'test'})
+    assert len(invalidations) == 3
+"
+
+check "server and site records" "
+from cli360monitoring.lib.records import ServerRecord, MonitorRecord
+server = {'id': 's1', 'name': 'web1', 'tags': ['web'], 'summary': {'cpu_usage_percent': 5, 'mem_usage_percent': 6, 'disk_usage_percent': 7}, 'last_data': {'cores': 2, 'df': [{'mount': '/', 'free_bytes': 1, 'used_bytes': 3}]}}
+record = ServerRecord(server)
+assert record.raw == server and record.get('name') == 'web1' and record.get('unknown', '') == ''
+assert record.tags == ('web',) and record.cores == 2 and record.memory_total == 0 and record.disks == (('/', 1, 3),)
+monitor = {'id': 'm1', 'url': 'example.com', 'monitor': {'name': 'Nuremberg, DE'}, 'uptime_percentage': '99.5'}
+record = MonitorRecord(monitor)
+assert record.raw == monitor and record.uptime_percentage == 99.5 and record.ttfb is None and record.name == ''
+"
+
+check "downtime index" "
+from cli360monitoring.lib.uptime import DowntimeIndex
+index = DowntimeIndex([(100, 200), (150, 250), (400, 500), (600, 600)])
+assert index.starts == [100, 400] and index.ends == [250, 500]
+assert index.downtime(0, 1000) == 250 and index.events(0, 1000) == 2
+assert index.downtime(200, 450) == 100 and index.events(200, 450) == 2
+assert index.downtime(250, 400) == 0 and index.events(250, 400) == 0
+uptime = index.uptime(0, 1000)
+assert uptime['uptime_percentage'] == 75 and uptime['downtime_seconds'] == 250
+index = DowntimeIndex.fromNotifications([{'start': '100', 'end': '200'}, {'start': '300', 'end': None}])
+assert index.events(0, 1000) == 2 and index.downtime(0, 250) == 100
+"
+
+check "notification chunks" "
+from cli360monitoring.lib.notifications import notificationChunks, DAY_SECONDS
+chunks = notificationChunks(10 * DAY_SECONDS + 5, 75 * DAY_SECONDS + 7, 30)
+assert chunks == [[0, 30 * DAY_SECONDS], [30 * DAY_SECONDS, 60 * DAY_SECONDS], [60 * DAY_SECONDS, 75 * DAY_SECONDS + 7]]
+assert notificationChunks(100, 200, 30) == [[0, 200]]
+assert notificationChunks(200, 100, 30) == [[200, 100]]
+"
+
+check "bulk lookup of nodes, servers and sites" "
+from cli360monitoring.lib.config import Config
+from cli360monitoring.lib.nodes import Nodes
+from cli360monitoring.lib.records import ServerRecord, MonitorRecord
+from cli360monitoring.lib.servers import Servers
+from cli360monitoring.lib.sites import Sites
+nodes = Nodes(Config('test'))
+nodes.nodes = [{'id': 'n1', 'pretty_name': 'Frankfurt, DE'}, {'id': 'n2', 'pretty_name': 'Frankfurt'}, {'id': 'n3', 'pretty_name': 'Frankfurt'}]
+assert nodes.getNodeIds(['Frankfurt', 'DE', 'Paris', '']) == {'Frankfurt': 'n2', 'DE': 'n1', 'Paris': '', '': ''}
+assert nodes.getNodeIds(['Frankfurt', 'DE']) == {name: nodes.getNodeId(name) for name in ['Frankfurt', 'DE']}
+servers = Servers(Config('test'))
+servers.servers = [ServerRecord({'id': 's1', 'name': 'web1'}), ServerRecord({'id': 's2', 'name': 'web1'}), ServerRecord({'id': 's3', 'name': 'db1'})]
+assert servers.getServerIds(['web1', 'db1', 'web']) == {'web1': 's1', 'db1': 's3', 'web': ''}
+sites = Sites(Config('test'))
+sites.monitors = [MonitorRecord({'id': 'm' + str(i), 'url': url, 'name': name, 'monitor': {'name': 'Frankfurt'}, 'uptime_percentage': 100}) for i, url, name in [(1, 'example.com', 'shop'), (2, 'shop', 'other'), (3, 'example.org', '')]]
+assert sites.getSiteIds(['shop', 'example.org', 'example.net']) == {'shop': 'm1', 'example.org': 'm3', 'example.net': ''}
+"
 
 test "360monitoring"
 test "360monitoring --version"
@@ -62,40 +370,66 @@ test "360monitoring contacts"
 test "360monitoring contacts add --name TestContact --email $TEST_EMAIL_ADDRESS"
 test "360monitoring contacts list"
 test "360monitoring contacts list --csv"
+test "360monitoring contacts list --ndjson"
 test "360monitoring recommendations"
 test "360monitoring incidents list --page-id $STATUS_PAGE_ID"
 test "360monitoring nodes --sort Name"
+test "360monitoring nodes --ndjson"
 test "360monitoring servers"
 test "360monitoring servers add"
 SERVER_ID=$(360monitoring servers list --csv | tail -n 1 | sed 's/,.*//')
 if [[ -n "$SERVER_ID" ]]; then
     test "360monitoring servers charts create --id $SERVER_ID"
     test "360monitoring servers events --id $SERVER_ID"
+    test "360monitoring servers events --id $SERVER_ID --ndjson"
+    test "360monitoring servers events --id $SERVER_ID --start \"2023-01-01\" --csv"
 fi
+test "360monitoring servers events --all --limit 100"
+test "360monitoring servers events --all --start \"2023-01-01\" --parallel 4 --csv"
+test "360monitoring servers events --tag web|db !test --ndjson"
+test "360monitoring servers events --pattern web --json"
 test "360monitoring servers list"
 test "360monitoring servers list --csv"
+test "360monitoring servers list --csv --limit 5"
+test "360monitoring servers list --ndjson"
+test "360monitoring servers list --ndjson --limit 5"
+test "360monitoring servers list --json"
 test "360monitoring servers list --issues --csv"
+test "360monitoring servers list --tag web|db !test --csv"
 # test "360monitoring servers update --tag test"
 test "360monitoring servers remove"
 test "360monitoring sites"
 test "360monitoring sites add --url $SITE_URL"
+test "360monitoring sites add --url $JOURNAL_SITE_URL"
 test "360monitoring sites list"
 test "360monitoring sites list --csv"
+test "360monitoring sites list --ndjson"
+test "360monitoring sites list --json"
 test "360monitoring sites list --issues --csv"
+test "360monitoring --no-cache sites list --csv"
+test "360monitoring --refresh sites list --csv"
 test "360monitoring sites list --help"
 test "360monitoring sites events --url $SITE_URL"
+test "360monitoring sites events --url $SITE_URL --ndjson"
 test "360monitoring sites uptime --url $SITE_URL"
 test "360monitoring sites uptime --url $SITE_URL --start \"2023-01-01\" --monthly"
+test "360monitoring sites uptime --url $SITE_URL --start \"2023-01-01\" --daily --local"
+test "360monitoring sites uptime --all"
+test "360monitoring sites uptime --all --csv"
+test "360monitoring sites uptime --all --local --start \"2023-01-01\" --monthly --ndjson"
 test "360monitoring statistics"
+test "360monitoring statistics --timings"
 test "360monitoring usertokens"
 test "360monitoring usertokens list"
 test "360monitoring usertokens list --csv"
+test "360monitoring usertokens list --ndjson"
 test "360monitoring wptoolkit"
 
 sleep 10
 
 test "360monitoring sites list --url $SITE_URL"
 test "360monitoring sites remove --url $SITE_URL"
+test "360monitoring sites remove --url $JOURNAL_SITE_URL --parallel 2 --journal $JOURNAL_FILE"
 test "360monitoring contacts remove --name TestContact"
 
 echo
@@ -8,6 +8,9 @@ here = os.path.abspath(os.path.dirname(__file__))
 
 readme = open(os.path.join(here, 'README.md')).read()
 install_requires = ['configparser', 'prettytable', 'requests']
+extras_require = {
+    'async': ['aiohttp'],
+}
 
 setuptools.setup(
     name='360monitoringcli',
@@ -39,6 +42,7 @@ setuptools.setup(
     ],
     keywords='360 system monitoring cli',
     install_requires=install_requires,
+    extras_require=extras_require,
     packages=setuptools.find_packages(),
     entry_points={
         'console_scripts': [